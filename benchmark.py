@@ -0,0 +1,555 @@
+import argparse
+import asyncio
+import json
+import os
+import resource
+import subprocess
+import sys
+import tracemalloc
+from math import ceil, inf
+from random import Random
+from time import time
+
+from engine import ai, batch, bitboard, parallel, records, shared_variables, stats
+from engine.context import SearchContext
+from engine.state import State
+from server import EngineServer, json_score
+
+
+# Fixed benchmark positions. Every position is a table given row by row and the turn flag (True is the player).
+POSITIONS = {
+    'start': (['-o-o-o-o', 'o-o-o-o-', '-o-o-o-o', '--------', '--------', 'x-x-x-x-', '-x-x-x-x', 'x-x-x-x-'],
+              True),
+    'opening': (['-o-o-o-o', '--o-o-o-', '---o---o', '----o-x-', '--------', 'o---x---', '-x-x-x-x', 'x-x-x-x-'],
+                False),
+    'middlegame': (['-o-o-o-o', '------o-', '---o-o-x', 'o---o---', '-----x--', 'o-------', '-x-x---x', 'x-x-x-x-'],
+                   False),
+    'exchange': (['-o-o-o-o', '------o-', '---o---x', '--------', '-o---x--', 'o-------', '-x-x----', 'x-x-x---'],
+                 False),
+    'endgame': (['-o---o-o', '------o-', '-------x', 'x-o-----', '--------', 'o-------', '---x----', '--x-x---'],
+                False),
+    'kings': (['--------', '--------', '---O----', '--------', '----X---', '--------', '-x------', '--------'],
+              False),
+}
+
+
+# This function creates the state of a benchmark position.
+def load_position(name):
+    rows, turn = POSITIONS[name]
+    return State([list(row) for row in rows], turn)
+
+
+# This function measures parallel_search against the number of workers on every benchmark position.
+# Every worker count starts with a new process pool, so workers do not keep tables from the previous run.
+# Searches only probe a tablebase if its path is given, here and in every benchmark below.
+def benchmark_parallel(depth, heuristic, worker_counts, tablebase = None):
+    # Initialize variable.
+    results = []
+
+    # Search every position with every worker count.
+    for workers in worker_counts:
+        context = SearchContext(depth, heuristic, workers = workers, tablebase = tablebase)
+        parallel.shutdown_pool()
+        parallel.get_pool(workers)
+        start_time = time()
+        for name in POSITIONS:
+            position = load_position(name)
+            parallel.parallel_search(context, position, depth, -inf, inf, not position.get_turn(), workers)
+        results.append((workers, time() - start_time, context.nodes))
+    parallel.shutdown_pool()
+
+    # Print the table. Speedup is relative to the first worker count.
+    print("Workers  Time (s)  Nodes     Speedup")
+    for workers, time_elapsed, nodes in results:
+        print("%-8d %-9.3f %-9d %.2f" % (workers, time_elapsed, nodes, results[0][1] / time_elapsed))
+
+
+# This function checks that HISTORY search gives the same root score as plain alpha-beta with fewer nodes.
+# Every search starts cold. It returns True if all positions pass.
+def benchmark_history(depth, tablebase = None):
+    # Initialize variable.
+    passed = True
+
+    # Search every position with both orderings.
+    print("Position     Plain score  Plain nodes  History score  History nodes  Result")
+    for name in POSITIONS:
+        results = []
+        for heuristic in ('NONE', 'HISTORY'):
+            context = SearchContext(depth, heuristic, tablebase = tablebase)
+            position = load_position(name)
+            evaluation = ai.alpha_beta(context, position, depth, -inf, inf, not position.get_turn())
+            results.append((evaluation, context.nodes))
+        (plain_score, plain_nodes), (history_score, history_nodes) = results
+
+        # Compare the results.
+        if plain_score != history_score:
+            result = "SCORE MISMATCH"
+        elif history_nodes > plain_nodes:
+            result = "MORE NODES"
+        else:
+            result = "ok"
+        passed = passed and result == "ok"
+        print("%-12s %-12s %-12d %-14s %-14d %s" % (name, plain_score, plain_nodes, history_score, history_nodes,
+                                                    result))
+
+    # Return the overall result.
+    return passed
+
+
+# This function prints the nodes every move ordering needs on every position, and checks the root scores agree.
+# Every search starts cold. It returns True if the scores agree on all positions.
+def benchmark_ordering(depth, heuristics, tablebase = None):
+    # Initialize variables.
+    passed = True
+    totals = [0] * len(heuristics)
+
+    # Search every position with every ordering.
+    print("Position     " + "".join("%-12s" % heuristic for heuristic in heuristics) + "Score")
+    for name in POSITIONS:
+        nodes = []
+        scores = set()
+        for heuristic in heuristics:
+            context = SearchContext(depth, heuristic, tablebase = tablebase)
+            position = load_position(name)
+            scores.add(ai.alpha_beta(context, position, depth, -inf, inf, not position.get_turn()))
+            nodes.append(context.nodes)
+        totals = [total + count for total, count in zip(totals, nodes)]
+        passed = passed and len(scores) == 1
+        score = str(scores.pop()) if len(scores) == 1 else "MISMATCH"
+        print("%-12s " % name + "".join("%-12d" % count for count in nodes) + score)
+    print("%-12s " % "total" + "".join("%-12d" % total for total in totals))
+
+    # Return the overall result.
+    return passed
+
+
+# This function collects the distinct positions reached from the stored positions within the given plies.
+def collect_positions(plies):
+    positions = {}
+    frontier = [load_position(name) for name in POSITIONS]
+    for _ in range(plies + 1):
+        next_frontier = []
+        for position in frontier:
+            if position.get_key() in positions:
+                continue
+            positions[position.get_key()] = position
+            next_frontier.extend(position.get_next_moves())
+        frontier = next_frontier
+    return list(positions.values())
+
+
+# This function checks the batch scores against bitboard.score_board on the positions reached within the plies, and
+# prints the time of both. It returns True if every score agrees.
+def benchmark_batch(plies):
+    # Initialize variables.
+    positions = collect_positions(plies)
+    boards = [position.get_bitboards() for position in positions]
+    bitboards = batch.pack_bitboards(positions)
+    squares = batch.bitboards_to_squares(bitboards)
+
+    # Score the boards one at a time, then in one pass of each layout.
+    start_time = time()
+    scores = [bitboard.score_board(x_pieces, o_pieces, kings) for x_pieces, o_pieces, kings in boards]
+    loop_time = time() - start_time
+    start_time = time()
+    bitboard_scores = batch.score_bitboards(bitboards)
+    bitboard_time = time() - start_time
+    start_time = time()
+    square_scores = batch.score_squares(squares)
+    square_time = time() - start_time
+
+    # Compare the scores.
+    passed = scores == bitboard_scores.tolist() == square_scores.tolist()
+    print("Positions: %d, scores %s" % (len(positions), "agree" if passed else "MISMATCH"))
+    print("Method     Time (s)  Boards/s")
+    for method, time_elapsed in (('loop', loop_time), ('bitboards', bitboard_time), ('squares', square_time)):
+        print("%-10s %-9.4f %.0f" % (method, time_elapsed, len(positions) / time_elapsed if time_elapsed else inf))
+
+    # Return the result.
+    return passed
+
+
+# Programs timed by the startup benchmark. Every one runs in a new interpreter, as an engine worker would start.
+STARTUP_PROGRAMS = (
+    ('interpreter', "pass"),
+    ('import', "import engine; engine.SearchContext; engine.search"),
+    ('first search', "import engine; engine.search(engine.new_game(), engine.SearchContext(depth = 1))"),
+)
+
+
+# This function measures the cold start of the engine: the time to start an interpreter, import the engine and
+# search a first position, each in a new process. The programs take turns, so every run of the engine is compared with
+# an interpreter started at about the same time. Times are medians of the runs. It returns True if the first search
+# costs at most the limit (in milliseconds) over the interpreter.
+def benchmark_startup(runs, limit):
+    # Initialize variables.
+    directory = os.path.dirname(os.path.abspath(__file__))
+    commands = [[sys.executable, '-c', program] for _, program in STARTUP_PROGRAMS]
+    times = [[] for _ in commands]
+    costs = [[] for _ in commands]
+
+    # Run every program in new interpreters. The first round is not timed, so caches (e.g. the Zobrist keys) are
+    # written.
+    for run in range(runs + 1):
+        round_times = []
+        for command in commands:
+            start_time = time()
+            subprocess.run(command, check = True, cwd = directory)
+            round_times.append((time() - start_time) * 1000)
+        if run == 0:
+            continue
+        for index, round_time in enumerate(round_times):
+            times[index].append(round_time)
+            costs[index].append(round_time - round_times[0])
+
+    # Print the table.
+    print("Program        Median (ms)  Over interpreter (ms)")
+    for (name, _), program_times, program_costs in zip(STARTUP_PROGRAMS, times, costs):
+        print("%-14s %-12.1f %.1f" % (name, sorted(program_times)[runs // 2], sorted(program_costs)[runs // 2]))
+    cost = sorted(costs[-1])[runs // 2]
+    print("First search costs %.1f ms over the interpreter (limit %.1f ms)" % (cost, limit))
+
+    # Return the result.
+    return cost <= limit
+
+
+# This function returns the search parameters of a benchmark report.
+def benchmark_config(depth, heuristic, search_mode, tablebase = None):
+    return SearchContext(depth, heuristic, search_mode = search_mode, tablebase = tablebase).get_config()
+
+
+# This function searches a position by iterative deepening up to the depth and returns its metrics as a dictionary.
+# Every search starts cold, with a new context. Memory is only traced and statistics (see engine/stats.py) are only
+# collected if asked, since both slow the search down.
+def measure_search(position, depth, heuristic, search_mode, trace_memory = False, collect_stats = False,
+                   tablebase = None):
+    # Initialize variables.
+    search_stats = stats.SearchStats() if collect_stats else None
+    context = SearchContext(depth, heuristic, search_mode = search_mode, tablebase = tablebase, stats = search_stats)
+    iterations = []
+    peak_memory = None
+
+    # Record the time at the end of every iteration.
+    def report(iteration_depth, evaluation, best_move):
+        iterations.append((iteration_depth, time() - start_time))
+
+    # Search the position without a time limit.
+    if trace_memory:
+        tracemalloc.start()
+    start_time = time()
+    evaluation, best_move, variation, completed_depth = ai.iterative_deepening(context, position, inf,
+                                                                              not position.get_turn(), depth,
+                                                                              report = report)
+    time_elapsed = time() - start_time
+    if trace_memory:
+        peak_memory = tracemalloc.get_traced_memory()[1] // 1024
+        tracemalloc.stop()
+
+    # The effective branching factor b is the one for which a full tree of the completed depth has as many nodes.
+    nodes = context.nodes
+    branching_factor = nodes ** (1 / completed_depth) if completed_depth else None
+
+    # Return the metrics.
+    return {
+        'score': json_score(evaluation),
+        'best_move': list(best_move) if best_move else None,
+        'depth': completed_depth,
+        'nodes': nodes,
+        'cutoffs': context.cutoffs,
+        'time': time_elapsed,
+        'nodes_per_second': nodes / time_elapsed if time_elapsed else None,
+        'branching_factor': branching_factor,
+        'time_to_depth': {str(iteration_depth): seconds for iteration_depth, seconds in iterations},
+        'transposition_hit_rate': context.transposition_table.get_hit_rate(),
+        'peak_memory_kb': peak_memory,
+        'stats': search_stats.to_dict() if search_stats is not None else None,
+    }
+
+
+# This function adds up the metrics of many searches.
+def sum_metrics(results):
+    nodes = sum(result['nodes'] for result in results)
+    time_elapsed = sum(result['time'] for result in results)
+    return {
+        'searches': len(results),
+        'nodes': nodes,
+        'cutoffs': sum(result['cutoffs'] for result in results),
+        'time': time_elapsed,
+        'nodes_per_second': nodes / time_elapsed if time_elapsed else None,
+        'peak_rss_kb': resource.getrusage(resource.RUSAGE_SELF).ru_maxrss,
+    }
+
+
+# This function searches every position of the suite and returns the report.
+def benchmark_suite(depth, heuristic, search_mode, names, trace_memory = False, collect_stats = False,
+                    tablebase = None):
+    # Search every position.
+    results = []
+    for name in names:
+        result = measure_search(load_position(name), depth, heuristic, search_mode, trace_memory, collect_stats,
+                                tablebase)
+        results.append({'position': name, **result})
+
+    # Return the report.
+    return {
+        'benchmark': 'suite',
+        'config': benchmark_config(depth, heuristic, search_mode, tablebase),
+        'positions': results,
+        'total': sum_metrics(results),
+    }
+
+
+# This function lets the AI play both sides from a stored position and returns the report.
+# The game ends when the side to move has no pieces or moves left (it loses), or after max_plies plies.
+def benchmark_selfplay(depth, heuristic, search_mode, max_plies, start = 'start', trace_memory = False,
+                       collect_stats = False, tablebase = None):
+    # Initialize variables.
+    position = load_position(start)
+    results = []
+    winner = None
+
+    # Play until the game is over or the ply limit is reached.
+    while len(results) < max_plies:
+        if position.get_game_end() or not position.get_moves():
+            winner = 'o' if position.get_turn() else 'x'
+            break
+        side = 'x' if position.get_turn() else 'o'
+        result = measure_search(position, depth, heuristic, search_mode, trace_memory, collect_stats, tablebase)
+        result = {'ply': len(results) + 1, 'side': side, **result}
+        results.append(result)
+        position = position.make_move(tuple(result['best_move']))
+
+    # Return the report.
+    return {
+        'benchmark': 'selfplay',
+        'config': benchmark_config(depth, heuristic, search_mode, tablebase),
+        'start': start,
+        'plies': len(results),
+        'winner': winner,
+        'moves': results,
+        'total': sum_metrics(results),
+    }
+
+
+# This function returns the value below which the fraction of the sorted values lies (nearest rank).
+def percentile(values, fraction):
+    return values[max(ceil(fraction * len(values)) - 1, 0)]
+
+
+# This function sends a request to the engine server and waits for the response.
+# It returns the response and the latency in seconds.
+async def send_request(reader, writer, request):
+    start_time = time()
+    writer.write(json.dumps(request).encode() + b'\n')
+    await writer.drain()
+    response = json.loads(await reader.readline())
+    return response, time() - start_time
+
+
+# This function plays games against the engine server over one connection, until the shared game numbers run out.
+# The client plays a random legal move for x and asks the server for the move of o. A request rejected as busy is
+# sent again after a short pause. The latency of every answered request is added to its command.
+async def play_server_games(host, port, game_numbers, max_plies, time_limit, seed, latencies, counters):
+    # Initialize variables.
+    reader, writer = await asyncio.open_connection(host, port)
+    random = Random(seed)
+
+    # Play the games.
+    try:
+        for _ in game_numbers:
+            game, latency = await send_request(reader, writer, {'command': 'new-game'})
+            latencies['new-game'].append(latency)
+            for ply in range(max_plies):
+                if game['winner'] is not None:
+                    break
+                if game['turn'] == 'x':
+                    request = {'command': 'make-move', 'game': game['game'], 'move': random.choice(game['moves'])}
+                else:
+                    request = {'command': 'get-ai-move', 'game': game['game'], 'time_limit': time_limit}
+                while True:
+                    response, latency = await send_request(reader, writer, request)
+                    if response['ok'] or response['error'] != 'busy':
+                        break
+                    counters['rejected'] += 1
+                    await asyncio.sleep(0.01)
+                if not response['ok']:
+                    raise RuntimeError(response['error'])
+                latencies[request['command']].append(latency)
+                game = response
+            _, latency = await send_request(reader, writer, {'command': 'close-game', 'game': game['game']})
+            latencies['close-game'].append(latency)
+            counters['games'] += 1
+    finally:
+        writer.close()
+        await writer.wait_closed()
+
+
+# This function runs the clients against a server, starting one in this process if no port is given.
+async def run_server_benchmark(clients, games, max_plies, time_limit, host, port, workers, queue_limit, seed,
+                               tablebase):
+    # Start a server on a free port, unless one is given.
+    server = None
+    if port is None:
+        server = EngineServer(workers, queue_limit, tablebase = tablebase)
+        host, port = await server.start(host, 0)
+
+    # Run the clients. They share the game numbers, so every game is played once.
+    latencies = {command: [] for command in EngineServer.COMMANDS}
+    counters = {'games': 0, 'rejected': 0}
+    game_numbers = iter(range(games))
+    start_time = time()
+    try:
+        await asyncio.gather(*(play_server_games(host, port, game_numbers, max_plies, time_limit, seed + client,
+                                                 latencies, counters) for client in range(clients)))
+    finally:
+        time_elapsed = time() - start_time
+        stats = server.get_stats() if server is not None else None
+        config = server.config if server is not None else None
+        if server is not None:
+            await server.close()
+
+    # Return the latencies, counters and time, with the statistics and search configuration of a started server.
+    return latencies, counters, time_elapsed, stats, config
+
+
+# This function measures the throughput and latency of the engine server under many simultaneous games and returns
+# the report. Latencies are in seconds, per command and overall.
+def benchmark_server(clients, games, max_plies, time_limit, host, port, workers, queue_limit, seed = 0,
+                     tablebase = None):
+    # Run the clients.
+    latencies, counters, time_elapsed, stats, config = asyncio.run(run_server_benchmark(clients, games, max_plies,
+                                                                                        time_limit, host, port,
+                                                                                        workers, queue_limit, seed,
+                                                                                        tablebase))
+
+    # Summarize the latencies.
+    summary = {}
+    latencies['all'] = [latency for command in EngineServer.COMMANDS for latency in latencies[command]]
+    for command, values in latencies.items():
+        if not values:
+            continue
+        values.sort()
+        summary[command] = {
+            'count': len(values),
+            'mean': sum(values) / len(values),
+            'p50': percentile(values, 0.5),
+            'p99': percentile(values, 0.99),
+            'max': values[-1],
+        }
+
+    # Return the report.
+    requests = len(latencies['all'])
+    return {
+        'benchmark': 'server',
+        'config': {'clients': clients, 'games': games, 'plies': max_plies, 'time_limit': time_limit,
+                   'workers': workers if port is None else None, 'queue_limit': queue_limit if port is None else None,
+                   'tablebase': config['tablebase'] if config is not None else None},
+        'games': counters['games'],
+        'requests': requests,
+        'rejected': counters['rejected'],
+        'time': time_elapsed,
+        'requests_per_second': requests / time_elapsed if time_elapsed else None,
+        'latency': summary,
+        'server': stats,
+    }
+
+
+# This function parses the command line and runs the requested benchmark.
+def main():
+    parser = argparse.ArgumentParser(description = "Checkers AI benchmarks.")
+    commands = parser.add_subparsers(dest = 'command', required = True)
+    parallel_parser = commands.add_parser('parallel', help = "speedup of parallel root search per worker count")
+    parallel_parser.add_argument('--depth', type = int, default = shared_variables.DEPTH)
+    parallel_parser.add_argument('--heuristic', default = shared_variables.HEURISTIC)
+    parallel_parser.add_argument('--workers', type = int, nargs = '+', default = [1, 2, 4])
+    history_parser = commands.add_parser('history', help = "HISTORY against plain alpha-beta: same score, fewer nodes")
+    history_parser.add_argument('--depth', type = int, default = shared_variables.DEPTH)
+    ordering_parser = commands.add_parser('ordering', help = "nodes searched by every move ordering")
+    ordering_parser.add_argument('--depth', type = int, default = shared_variables.DEPTH)
+    ordering_parser.add_argument('--heuristics', nargs = '+', default = ['NONE', 'HISTORY', 'KILLER', 'PVS'])
+    startup_parser = commands.add_parser('startup', help = "cold start of the engine in new processes")
+    startup_parser.add_argument('--runs', type = int, default = 30)
+    startup_parser.add_argument('--limit', type = float, default = 10.0,
+                                help = "largest cost of the first search over the interpreter, in milliseconds")
+    batch_parser = commands.add_parser('batch', help = "batch scores against one board at a time (needs NumPy)")
+    batch_parser.add_argument('--plies', type = int, default = 4, help = "plies from the stored positions")
+    for name, text in (('suite', "metrics of every stored position, as JSON"),
+                       ('selfplay', "metrics of a game of the AI against itself, as JSON")):
+        report_parser = commands.add_parser(name, help = text)
+        report_parser.add_argument('--depth', type = int, default = shared_variables.DEPTH)
+        report_parser.add_argument('--heuristic', default = shared_variables.HEURISTIC)
+        report_parser.add_argument('--search-mode', default = shared_variables.SEARCH_MODE,
+                                   choices = ['STATE', 'MAKE_UNMAKE'])
+        report_parser.add_argument('--memory', action = 'store_true', help = "trace peak memory of every search")
+        report_parser.add_argument('--stats', action = 'store_true', help = "collect statistics of every search")
+        report_parser.add_argument('--profile', help = "write a cProfile profile of the run to this file")
+        report_parser.add_argument('--output', help = "write the report to this file instead of printing it")
+    commands.choices['suite'].add_argument('--positions', nargs = '+', default = list(POSITIONS),
+                                           choices = list(POSITIONS))
+    commands.choices['selfplay'].add_argument('--plies', type = int, default = 100)
+    commands.choices['selfplay'].add_argument('--start', default = 'start', choices = list(POSITIONS))
+    commands.choices['selfplay'].add_argument('--record', help = "also write the game to this game record file")
+    server_parser = commands.add_parser('server', help = "throughput and latency of the engine server, as JSON")
+    server_parser.add_argument('--clients', type = int, default = 8, help = "connections playing at the same time")
+    server_parser.add_argument('--games', type = int, default = 16)
+    server_parser.add_argument('--plies', type = int, default = 40, help = "plies played per game at most")
+    server_parser.add_argument('--time-limit', type = float, default = 0.1, help = "time limit of every AI move")
+    server_parser.add_argument('--host', default = shared_variables.SERVER_HOST)
+    server_parser.add_argument('--port', type = int, help = "port of a running server (default: start one)")
+    server_parser.add_argument('--workers', type = int, default = shared_variables.SERVER_WORKERS,
+                               help = "worker processes of the started server")
+    server_parser.add_argument('--queue-limit', type = int, default = shared_variables.SERVER_QUEUE_LIMIT,
+                               help = "queue limit of the started server")
+    server_parser.add_argument('--output', help = "write the report to this file instead of printing it")
+    for command_parser in commands.choices.values():
+        if command_parser is not startup_parser and command_parser is not batch_parser:
+            command_parser.add_argument('--tablebase', help = "tablebase file the searches probe (default: none)")
+    arguments = parser.parse_args()
+
+    if arguments.command == 'parallel':
+        benchmark_parallel(arguments.depth, arguments.heuristic, arguments.workers, arguments.tablebase)
+    if arguments.command == 'history':
+        if not benchmark_history(arguments.depth, arguments.tablebase):
+            exit(1)
+    if arguments.command == 'ordering':
+        if not benchmark_ordering(arguments.depth, arguments.heuristics, arguments.tablebase):
+            exit(1)
+    if arguments.command == 'startup':
+        if not benchmark_startup(arguments.runs, arguments.limit):
+            exit(1)
+    if arguments.command == 'batch':
+        if not benchmark_batch(arguments.plies):
+            exit(1)
+    if arguments.command in ('suite', 'selfplay', 'server'):
+        if arguments.command == 'suite':
+            function = benchmark_suite
+            function_arguments = (arguments.depth, arguments.heuristic, arguments.search_mode, arguments.positions,
+                                  arguments.memory, arguments.stats, arguments.tablebase)
+        elif arguments.command == 'selfplay':
+            function = benchmark_selfplay
+            function_arguments = (arguments.depth, arguments.heuristic, arguments.search_mode, arguments.plies,
+                                  arguments.start, arguments.memory, arguments.stats, arguments.tablebase)
+        else:
+            function = benchmark_server
+            function_arguments = (arguments.clients, arguments.games, arguments.plies, arguments.time_limit,
+                                  arguments.host, arguments.port, arguments.workers, arguments.queue_limit, 0,
+                                  arguments.tablebase)
+        if getattr(arguments, 'profile', None):
+            report = stats.profile(arguments.profile, function, *function_arguments)
+        else:
+            report = function(*function_arguments)
+        if arguments.command == 'selfplay' and arguments.record:
+            start = records.get_position(load_position(arguments.start))
+            moves = [tuple(result['best_move']) for result in report['moves']]
+            result = {'x': records.X_WIN, 'o': records.O_WIN}.get(report['winner'], records.UNKNOWN)
+            records.write_games(arguments.record, [(start, moves, result)])
+        text = json.dumps(report, indent = 2)
+        if arguments.output:
+            with open(arguments.output, 'w') as file:
+                file.write(text + '\n')
+        else:
+            print(text)
+
+
+if __name__ == '__main__':
+    main()
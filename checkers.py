@@ -1,18 +1,18 @@
 from os import system
-from math import inf
 from time import time, sleep
 from copy import deepcopy
 
-import shared_variables
+from engine import book, shared_variables
+from engine.ai import search
+from engine.context import SearchContext
+from engine.ponder import Ponderer
+from engine.state import State
 from helper import *
-from ai import *
-from state import State
 
 
 # This function evaluates the current state and checks if it reached the game over state.
 # The game over condition is where one of the players has no more pieces to move.
 def game_over(position):
-    moves = position.get_next_moves()
     piece_counter = position.count_pieces()
 
     # If player pieces is zero, AI has won.
@@ -26,7 +26,7 @@ def game_over(position):
         return True
 
     # If current player has no more moves, the game is over.
-    if not moves:
+    if not position.get_moves():
         print("There are no possible moves left! Game over!")
         return True
 
@@ -53,15 +53,17 @@ def initialize_board():
 
 
 # This function starts the game. It begins with the player's turn, followed by the AI.
-def main():
+# The AI searches with the given search context, which also collects the metrics of the game.
+def main(context):
     # Initialize variables.
     board = initialize_board()
     position = State(board, True)
     time_previous_move = 0
 
     # Acquire parameters from shared_variables.
-    depth = shared_variables.DEPTH
-    move_ordering = shared_variables.HEURISTIC
+    opening_book = book.load(shared_variables.BOOK_PATH)
+    ponderer = Ponderer(context) if shared_variables.PONDER else None
+    expected_move = None
 
     # Start game.
     # Loops until game over condition is met.
@@ -73,6 +75,10 @@ def main():
         # Get pieces that can capture.
         available_pieces = position.find_capturing_moves()
 
+        # Search the likely replies while the player is thinking.
+        if ponderer is not None:
+            ponderer.start(position, expected_move)
+
         # Print board.
         print_table(position.get_table(), available_pieces)
 
@@ -88,11 +94,18 @@ def main():
         # Choose which position to go to.
         new_position = choose_field(valid_moves)
 
+        # Choose which pieces to capture if several capture sequences land on the field.
+        captures = position.find_captures_for_field(piece, new_position)
+        captured = choose_capture(captures) if len(captures) > 1 else None
+
         # Copy current state (before player move) for printing.
         previous_table = deepcopy(position.get_table())
 
         # Perform move.
-        position = position.play_move(piece, new_position)
+        position = position.play_move(piece, new_position, captured)
+
+        # Stop pondering. Keep the search of the move played, if it was pondered to the end.
+        pondered = ponderer.stop(position) if ponderer is not None else None
 
         # Print board with player move.
         differences = position.find_move_played(previous_table)
@@ -110,11 +123,25 @@ def main():
         # Get start time (right before AI move).
         start_time = time()
 
-        # Perform AI algorithm.
-        alpha_beta(position, depth, -inf, inf, True, move_ordering)
+        # Play a book move if the position is in the opening book.
+        best_move = book.choose_move(opening_book, position)
+        variation = []
+        if best_move is not None:
+            context.book_hits += 1
 
-        # Perform move.
-        position = max(position.get_next_moves())
+        # Play the pondered move if the player played a pondered reply.
+        elif pondered is not None:
+            evaluation, best_move, variation = pondered
+            context.ponder_hits += 1
+
+        # Otherwise, perform AI algorithm.
+        # Search deeper until the time limit runs out, or to a fixed depth if there is no time limit.
+        else:
+            evaluation, best_move, variation = search(position, context)
+
+        # Perform move. The principal variation holds the expected reply of the player.
+        position = position.make_move(best_move)
+        expected_move = variation[1] if len(variation) > 1 else None
 
         # Get end time (right after AI move).
         end_time = time()
@@ -122,8 +149,8 @@ def main():
         # Compute AI search and move time.
         time_elapsed = end_time - start_time
 
-        # Add search time to shared_variables time variable.
-        shared_variables.TIME += time_elapsed
+        # Add search time to the context time variable.
+        context.time += time_elapsed
 
         # Print board with AI move.
         differences = position.find_move_played(previous_table)
@@ -134,17 +161,29 @@ def main():
 # This is the main function.
 # It will run the main program and will terminate when Control + C is pressed.
 if __name__ == '__main__':
+    # Create the search context of the game from shared_variables.
+    context = SearchContext(time_limit = shared_variables.TIME_LIMIT)
     try:
         # Start main program.
-        main()
+        main(context)
     except KeyboardInterrupt:
         # Print parameters and metrics.
         system('clear')
-        print("Move ordering: " + shared_variables.HEURISTIC)
-        print("Depth: " + str(shared_variables.DEPTH))
-        print("Nodes: " + str(shared_variables.NODE_COUNTER))
-        print("Cutoffs: " + str(shared_variables.CUTOFF_COUNTER))
-        print("Search time: " + str(shared_variables.TIME))
+        print("Move ordering: " + context.heuristic)
+        print("Depth: " + str(context.depth))
+        print("Search mode: " + context.search_mode)
+        print("Time limit: " + str(context.time_limit))
+        print("Workers: " + str(context.workers))
+        print("Nodes: " + str(context.nodes))
+        print("Cutoffs: " + str(context.cutoffs))
+        print("Search time: " + str(context.time))
+        print("Cache size: " + str(len(context.cache)))
+        print("Cache peak: " + str(context.cache_peak))
+        print("Transposition entries: " + str(context.transposition_table.entries))
+        print("Transposition hit rate: " + str(context.transposition_table.get_hit_rate()))
+        print("Tablebase hits: " + str(context.tablebase_hits))
+        print("Book hits: " + str(context.book_hits))
+        print("Ponder hits: " + str(context.ponder_hits))
 
         # Terminate program.
         exit()
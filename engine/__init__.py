@@ -0,0 +1,60 @@
+# This package is the checkers engine: positions, search, tables and records, without the terminal game (checkers.py
+# and helper.py). Importing it loads nothing else: every name below is imported from its module on first use, so a
+# process only pays for what it uses. The modules can also be imported directly, e.g. engine.ai.
+# Command line tools run as modules, e.g. python -m engine.tablebase.
+#
+#   import engine
+#   position = engine.new_game()
+#   evaluation, best_move, variation = engine.search(position, engine.SearchContext(depth = 6))
+#   position = position.make_move(best_move)
+
+# Module of every exported name.
+EXPORTS = {
+    # Positions and moves.
+    'State': 'state',
+    'Board': 'board',
+    'generate_moves': 'bitboard',
+    'apply_move': 'bitboard',
+    'table_to_bitboards': 'bitboard',
+    'bitboards_to_table': 'bitboard',
+    'compute_key': 'zobrist',
+
+    # Search.
+    'SearchContext': 'context',
+    'SearchTimeout': 'ai',
+    'search': 'ai',
+    'iterative_deepening': 'ai',
+    'alpha_beta': 'ai',
+    'SearchStats': 'stats',
+
+    # Records.
+    'encode_position': 'records',
+    'decode_position': 'records',
+    'iterate_positions': 'records',
+    'write_positions': 'records',
+    'iterate_games': 'records',
+    'write_games': 'records',
+}
+
+__all__ = sorted(EXPORTS) + ['new_game']
+
+
+# This function imports an exported name on first use and keeps it in the package, so later uses are plain lookups.
+def __getattr__(name):
+    if name not in EXPORTS:
+        raise AttributeError("module %r has no attribute %r" % (__name__, name))
+    value = getattr(__import__(EXPORTS[name], globals(), None, [name], 1), name)
+    globals()[name] = value
+    return value
+
+
+# This function lists the exported names with the loaded ones.
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
+
+
+# This function returns the start position of a game, with the player (x) to move.
+def new_game():
+    from .bitboard import START_O_PIECES, START_X_PIECES
+    from .state import State
+    return State(turn = True, bitboards = (START_X_PIECES, START_O_PIECES, 0))
@@ -0,0 +1,603 @@
+from math import inf
+from time import time
+
+from .bitboard import decode_move, encode_move, find_jumpers
+from .board import Board
+from .context import DEADLINE_CHECK_INTERVAL, SearchContext
+from .ordering import ORDERINGS, order_moves, update_history, update_killers
+from .tablebase import DRAW, LOSS
+from .transposition import EXACT, LOWER, UPPER
+
+
+# This module implements the search. Every function takes the search context (see context.py), which holds the
+# tables, counters, limits and configuration of the search.
+
+# Score of a tablebase win. The distance to the end of the game is taken off, so shorter wins score higher.
+TABLEBASE_WIN = 10000
+
+# Heuristics that search with principal variation search and aspiration windows. Their move ordering is in
+# ordering.ORDERINGS, like the other heuristics.
+PVS_HEURISTICS = ('PVS',)
+
+# Aspiration windows. An iteration first searches this far on both sides of the score of the previous one. The side the
+# score falls out of is widened by the growth factor and searched again, and opened fully once it reaches the limit.
+ASPIRATION_WINDOW = 10
+ASPIRATION_GROWTH = 4
+ASPIRATION_LIMIT = 400
+
+
+# This exception stops a search that ran past the deadline of its context, or that was asked to stop.
+class SearchTimeout(Exception):
+    pass
+
+
+# This function records a visited position in the search cache. The cache stops growing at the cache limit.
+def cache_position(context, position):
+    if len(context.cache) < context.cache_limit:
+        context.cache.add(position.get_key())
+        context.cache_peak = max(context.cache_peak, len(context.cache))
+
+
+# This function looks up the position in the transposition table.
+# It returns the stored score if it can be used for the given depth and window (otherwise None), and the stored
+# best move as a move tuple.
+def probe_transposition(context, position, depth, alpha, beta):
+    # Get the entry of the position.
+    entry = context.transposition_table.probe(position.get_key())
+    if entry is None:
+        if context.stats is not None:
+            context.stats.record_probe(False, False)
+        return None, None
+
+    # Use the score only if it was searched deep enough and its bound settles the window.
+    _, entry_depth, bound, score, best_move, _ = entry
+    usable = entry_depth >= depth and (bound == EXACT or (bound == LOWER and score >= beta) or
+                                       (bound == UPPER and score <= alpha))
+    if context.stats is not None:
+        context.stats.record_probe(True, usable)
+    if best_move is not None:
+        best_move = decode_move(best_move)
+    if usable:
+        return score, best_move
+
+    # Otherwise, only the best move can be used.
+    return None, best_move
+
+
+# This function stores the result of a node in the transposition table. The best move is stored as a move code.
+# The bound type depends on where the score fell relative to the original window.
+def store_transposition(context, position, depth, alpha, beta, score, best_move):
+    if score <= alpha:
+        bound = UPPER
+    elif score >= beta:
+        bound = LOWER
+    else:
+        bound = EXACT
+    if best_move is not None:
+        best_move = encode_move(best_move, position.get_bitboards()[2])
+    context.transposition_table.store(position.get_key(), depth, bound, score, best_move)
+
+
+# This function looks up the position in the endgame tablebase.
+# It returns the exact score from the side to move, or None if the tablebase does not cover the position.
+def probe_tablebase(context, position):
+    # Only positions with few enough pieces are in the tablebase.
+    tablebase = context.tablebase
+    if tablebase is None:
+        return None
+    x_pieces, o_pieces, kings = position.get_bitboards()
+    if (x_pieces | o_pieces).bit_count() > tablebase.get_pieces():
+        return None
+    value = tablebase.probe(x_pieces, o_pieces, kings, position.get_turn())
+    if value is None:
+        return None
+
+    # Convert the stored result to a score.
+    context.tablebase_hits += 1
+    if value == DRAW:
+        return 0
+    if value < LOSS:
+        return TABLEBASE_WIN - value
+    return value - LOSS - TABLEBASE_WIN
+
+
+# This function raises SearchTimeout once the deadline of the context has passed, or once the search was asked to
+# stop (e.g. by another thread). The clock is only read every DEADLINE_CHECK_INTERVAL calls.
+def check_deadline(context):
+    context.deadline_countdown -= 1
+    if context.deadline_countdown <= 0:
+        context.deadline_countdown = DEADLINE_CHECK_INTERVAL
+        if context.stop or time() > context.deadline:
+            raise SearchTimeout()
+
+
+# This function returns the node to search after a move.
+# In 'MAKE_UNMAKE' search mode, every State child of the root is copied once into a Board and searched in place
+# below it.
+def search_node(context, child, ply):
+    if ply == 0 and context.search_mode == 'MAKE_UNMAKE' and not isinstance(child, Board):
+        x_pieces, o_pieces, kings = child.get_bitboards()
+        return Board(x_pieces, o_pieces, kings, child.get_turn(), child.get_key(), child.get_score())
+    return child
+
+
+# This function follows the best moves stored in the transposition table from the position.
+# It returns the moves of the principal variation, at most depth moves long.
+def collect_principal_variation(context, position, depth):
+    # Initialize variables.
+    board = Board(*position.get_bitboards(), position.get_turn(), position.get_key())
+    variation = []
+
+    # Follow the stored best move until it is missing or does not match a legal move.
+    while len(variation) < depth:
+        entry = context.transposition_table.probe(board.get_key())
+        if entry is None or entry[4] is None:
+            break
+        move = decode_move(entry[4])
+        if move not in board.get_moves():
+            break
+        variation.append(move)
+        board.make_move(move)
+
+    # Return variation.
+    return variation
+
+
+# This function returns the principal variation of the moves as a dictionary from the key of every position along
+# them, starting with the position, to the move played there.
+def variation_moves(position, moves):
+    # Initialize variables.
+    board = Board(*position.get_bitboards(), position.get_turn(), position.get_key())
+    variation = {}
+
+    # Play the moves and collect the keys.
+    for move in moves:
+        variation[board.get_key()] = move
+        board.make_move(move)
+
+    # Return variation.
+    return variation
+
+
+# This function stores the moves as the best moves of the positions along them, starting with the position, so the
+# next search follows them first.
+def store_variation(context, position, moves):
+    board = Board(*position.get_bitboards(), position.get_turn(), position.get_key())
+    for move in moves:
+        context.transposition_table.store_move(board.get_key(), encode_move(move, board.get_bitboards()[2]))
+        board.make_move(move)
+
+
+# This function searches the captures below a horizon node until the position is quiet, so the search does not stop
+# in the middle of an exchange. Captures are mandatory, so the side to move can only stand pat (take the static
+# evaluation) when it has no capture. Scores and window are from the side to move, as in negamax.
+# The extension stops and evaluates the position when the node budget of the horizon node is used up.
+# Reference used, https://www.chessprogramming.org/Quiescence_Search.
+def quiescence(context, position, alpha, beta, sign):
+    # Initialize variables.
+    context.nodes += 1
+    x_pieces, o_pieces, kings = position.get_bitboards()
+    if context.stats is not None:
+        context.stats.record_quiescence_node()
+
+    # Stop the search if the deadline has passed.
+    if context.deadline is not None:
+        check_deadline(context)
+
+    # Return the exact score of a tablebase position.
+    if not position.get_game_end():
+        score = probe_tablebase(context, position)
+        if score is not None:
+            return score
+
+    # Stand pat if the position is quiet, the game is over or the budget is used up.
+    if context.quiescence_countdown <= 0 or position.get_game_end() or not find_jumpers(x_pieces, o_pieces, kings,
+                                                                                          position.get_turn()):
+        return sign * position.evaluate_state()
+    context.quiescence_countdown -= 1
+
+    # Search every capture. The moves are all captures, since captures are mandatory.
+    max_evaluation = -inf
+    # The move is taken back even if the search times out, so a Board is left as it was.
+    for move in position.get_moves():
+        child = position.make_move(move)
+        try:
+            evaluation = -quiescence(context, child, -beta, -alpha, -sign)
+        finally:
+            position.unmake_move()
+        max_evaluation = max(max_evaluation, evaluation)
+        alpha = max(alpha, evaluation)
+
+        # This is the Alpha-Beta cutoff. Increment counter cutoff counter.
+        if alpha >= beta:
+            context.cutoffs += 1
+            break
+
+    # Return the evaluation of the captures.
+    return max_evaluation
+
+
+# This function evaluates a node at the search horizon, from the side to move.
+# If quiescence search is on in the context, pending captures are searched first (see quiescence).
+def evaluate_horizon(context, position, alpha, beta, sign):
+    # Without quiescence search, return the static evaluation.
+    if not context.quiescence:
+        return sign * position.evaluate_state()
+
+    # Search the captures with a new node budget.
+    context.quiescence_countdown = context.quiescence_nodes
+    evaluation = quiescence(context, position, alpha, beta, sign)
+    position.set_evaluation(sign * evaluation)
+
+    # Return the evaluation.
+    return evaluation
+
+
+# This function is the implementation of Negamax with fail-soft Alpha-Beta Pruning and move ordering.
+# The moves are ordered by the stages of the heuristic (see ordering.py), e.g. History Heuristics.
+# Scores are from the side to move, so every child score is negated. The transposition table keeps scores from
+# the AI's side, so the score and window are converted when the player is to move.
+# With a heuristic of PVS_HEURISTICS, it runs a principal variation search: the first move is searched with the full
+# window and the other moves with a null window, which only tells whether they beat the first one. Only a move that
+# does is searched again with the full window. Scores are integers, so a window one wide is a null window.
+# Reference used, https://www.chessprogramming.org/Alpha-Beta#Negamax_Framework.
+# Reference used, https://www.chessprogramming.org/Principal_Variation_Search.
+def negamax(context, position, depth, alpha, beta, ply = 0):
+    # Initialize variables.
+    context.nodes += 1
+    sign = -1 if position.get_turn() else 1
+    stats = context.stats
+    scout = context.heuristic in PVS_HEURISTICS
+    if stats is not None:
+        stats.record_node(ply)
+
+    # Stop the search if the deadline has passed.
+    if context.deadline is not None:
+        check_deadline(context)
+
+    # Check if current state is game over, or evaluate it if at depth 0.
+    if position.get_game_end():
+        if stats is not None:
+            return sign * stats.time('evaluation', position.evaluate_state)
+        return sign * position.evaluate_state()
+
+    # Return the exact score of a tablebase position, except at the root, which needs a move.
+    if ply > 0:
+        score = probe_tablebase(context, position)
+        if score is not None:
+            position.set_evaluation(sign * score)
+            return score
+    if depth == 0:
+        if stats is not None:
+            return stats.time('evaluation', evaluate_horizon, context, position, alpha, beta, sign)
+        return evaluate_horizon(context, position, alpha, beta, sign)
+
+    # Look up the position. Return the stored score if it settles this node.
+    original_alpha, original_beta = (alpha, beta) if sign == 1 else (-beta, -alpha)
+    score, hash_move = probe_transposition(context, position, depth, original_alpha, original_beta)
+    if score is not None and ply > 0:
+        position.set_evaluation(score)
+        return sign * score
+
+    # Get possible moves. Order them, searching the principal variation move or the stored best move first.
+    hash_move = context.principal_variation.get(position.get_key(), hash_move)
+    if stats is None:
+        moves = order_moves(context, position, position.get_moves(), ply, hash_move)
+    else:
+        moves = stats.time('ordering', order_moves, context, position, stats.generate_moves(position), ply, hash_move)
+    best_move = None
+    max_evaluation = -inf
+
+    # Iterate through the move list. Every child counts itself as a node.
+    for index, move in enumerate(moves):
+        # Play the move and record it in the search cache.
+        child = position.make_move(move)
+        cache_position(context, child)
+
+        # Recursive call with the negated window, or with a null window after the first move of a principal variation
+        # search. A move that beats alpha inside the window is searched again. Take the move back afterwards, even if
+        # the search times out, so a Board is left as it was.
+        node = search_node(context, child, ply)
+        try:
+            if scout and index > 0:
+                evaluation = -negamax(context, node, depth - 1, -alpha - 1, -alpha, ply + 1)
+                if alpha < evaluation < beta:
+                    evaluation = -negamax(context, node, depth - 1, -beta, -alpha, ply + 1)
+            else:
+                evaluation = -negamax(context, node, depth - 1, -beta, -alpha, ply + 1)
+        finally:
+            position.unmake_move()
+        child.set_evaluation(sign * evaluation)
+
+        # Get max value between max_evaluation and evaluation. Update best move afterwards.
+        if best_move is None or evaluation > max_evaluation:
+            max_evaluation = evaluation
+            best_move = move
+        alpha = max(alpha, evaluation)
+
+        # This is the Alpha-Beta cutoff. Increment counter cutoff counter.
+        # Only moves that cause a cutoff are rewarded in the history table and the killer slots.
+        if beta <= alpha:
+            context.cutoffs += 1
+            if stats is not None:
+                stats.record_cutoff(ply, index)
+            update_history(context, move, depth)
+            update_killers(context, move, ply)
+            break
+
+    # Update move evaluation.
+    position.set_evaluation(sign * max_evaluation)
+
+    # Store the result of the node.
+    store_transposition(context, position, depth, original_alpha, original_beta, sign * max_evaluation, best_move)
+
+    # Return the evaluation of the move.
+    return max_evaluation
+
+
+# This function is the implementation of Minimax with Alpha-Beta Pruning.
+# If the heuristic of the context names a move ordering (e.g. "HISTORY", see ordering.ORDERINGS), it searches with
+# negamax and orders the moves. Otherwise, it will only search the principal variation or stored best move first.
+# Scores are always from the AI's side: the AI (o) is the max player and the player (x) is the min player.
+# Every node probes the transposition table before expanding. The root (ply 0) always searches its children.
+# The position can be a State, whose children are new states, or a Board, whose moves are made and unmade in place.
+def alpha_beta(context, position, depth, alpha, beta, max_player, ply = 0):
+    # Perform Negamax with Alpha-Beta Pruning and Move Ordering.
+    # Negamax scores are from the side to move, so the player's scores and window are negated.
+    if context.heuristic in ORDERINGS:
+        if position.get_turn():
+            return -negamax(context, position, depth, -beta, -alpha, ply)
+        return negamax(context, position, depth, alpha, beta, ply)
+
+    # Initialize variables.
+    context.nodes += 1
+    stats = context.stats
+    if stats is not None:
+        stats.record_node(ply)
+
+    # Stop the search if the deadline has passed.
+    if context.deadline is not None:
+        check_deadline(context)
+
+    # Check if current state is game over, or evaluate it if at depth 0.
+    # The horizon is evaluated from the side to move, so the player's window and score are negated.
+    if position.get_game_end():
+        if stats is not None:
+            return stats.time('evaluation', position.evaluate_state)
+        return position.evaluate_state()
+
+    # Return the exact score of a tablebase position, except at the root, which needs a move.
+    # Tablebase scores are from the side to move, so the player's score is negated.
+    if ply > 0:
+        score = probe_tablebase(context, position)
+        if score is not None:
+            score = -score if position.get_turn() else score
+            position.set_evaluation(score)
+            return score
+    if depth == 0:
+        sign = -1 if position.get_turn() else 1
+        if position.get_turn():
+            alpha, beta = -beta, -alpha
+        if stats is not None:
+            return sign * stats.time('evaluation', evaluate_horizon, context, position, alpha, beta, sign)
+        return sign * evaluate_horizon(context, position, alpha, beta, sign)
+
+    # Look up the position. Return the stored score if it settles this node.
+    score, hash_move = probe_transposition(context, position, depth, alpha, beta)
+    if score is not None and ply > 0:
+        position.set_evaluation(score)
+        return score
+
+    # Get possible moves. Search the principal variation move or the stored best move first.
+    hash_move = context.principal_variation.get(position.get_key(), hash_move)
+    if stats is None:
+        moves = order_moves(context, position, position.get_moves(), ply, hash_move)
+    else:
+        moves = stats.time('ordering', order_moves, context, position, stats.generate_moves(position), ply, hash_move)
+    best_move = None
+    original_alpha = alpha
+    original_beta = beta
+
+    # Perform Minimax with Alpha-Beta Pruning.
+    if max_player:
+        # Initialize variable.
+        max_evaluation = -inf
+
+        # Every child counts itself as a node.
+        for index, move in enumerate(moves):
+            # Play the move and record it in the search cache.
+            child = position.make_move(move)
+            cache_position(context, child)
+
+            # Recursive call. Take the move back afterwards, even if the search times out.
+            try:
+                evaluation = alpha_beta(context, search_node(context, child, ply), depth - 1, alpha, beta, False,
+                                        ply + 1)
+            finally:
+                position.unmake_move()
+            child.set_evaluation(evaluation)
+            alpha = max(alpha, evaluation)
+
+            # Update best move if the evaluation is better.
+            if best_move is None or evaluation > max_evaluation:
+                max_evaluation = evaluation
+                best_move = move
+
+            # This is the Alpha-Beta cutoff. Increment counter cutoff counter.
+            if beta <= alpha:
+                context.cutoffs += 1
+                if stats is not None:
+                    stats.record_cutoff(ply, index)
+                break
+
+        # Update move evaluation.
+        position.set_evaluation(max_evaluation)
+
+        # Store the result of the node.
+        store_transposition(context, position, depth, original_alpha, original_beta, max_evaluation, best_move)
+
+        # Return the evaluation of the move.
+        return max_evaluation
+    else:
+        # Initialize variable.
+        min_evaluation = inf
+
+        # Every child counts itself as a node.
+        for index, move in enumerate(moves):
+            # Play the move and record it in the search cache.
+            child = position.make_move(move)
+            cache_position(context, child)
+
+            # Recursive call. Take the move back afterwards, even if the search times out.
+            try:
+                evaluation = alpha_beta(context, search_node(context, child, ply), depth - 1, alpha, beta, True,
+                                        ply + 1)
+            finally:
+                position.unmake_move()
+            child.set_evaluation(evaluation)
+            beta = min(beta, evaluation)
+
+            # Update best move if the evaluation is better.
+            if best_move is None or evaluation < min_evaluation:
+                min_evaluation = evaluation
+                best_move = move
+
+            # This is the Alpha-Beta cutoff. Increment counter cutoff counter.
+            if beta <= alpha:
+                context.cutoffs += 1
+                if stats is not None:
+                    stats.record_cutoff(ply, index)
+                break
+
+        # Update move evaluation.
+        position.set_evaluation(min_evaluation)
+
+        # Store the result of the node.
+        store_transposition(context, position, depth, original_alpha, original_beta, min_evaluation, best_move)
+
+        # Return the evaluation of the move.
+        return min_evaluation
+
+
+# This function returns the best move of the position and the principal variation starting with it,
+# as stored in the transposition table by the last search of the position.
+def read_search_result(context, position, depth):
+    variation = collect_principal_variation(context, position, depth)
+    if variation:
+        return variation[0], variation
+    return None, []
+
+
+# This function searches the position with an aspiration window around the expected evaluation, from the AI's side.
+# When the evaluation falls out of the window, it is only a bound, so the failed side is widened and the position is
+# searched again. It returns the evaluation, which is exact once it falls inside the window.
+# Reference used, https://www.chessprogramming.org/Aspiration_Windows.
+def aspiration_search(context, position, depth, evaluation, max_player, search_function):
+    # Initialize variables.
+    low_window = high_window = ASPIRATION_WINDOW
+    alpha = evaluation - low_window
+    beta = evaluation + high_window
+
+    # Search until the evaluation falls inside the window.
+    while True:
+        result = search_function(context, position, depth, alpha, beta, max_player)
+        if result <= alpha and alpha > -inf:
+            low_window *= ASPIRATION_GROWTH
+            alpha = evaluation - low_window if low_window < ASPIRATION_LIMIT else -inf
+        elif result >= beta and beta < inf:
+            high_window *= ASPIRATION_GROWTH
+            beta = evaluation + high_window if high_window < ASPIRATION_LIMIT else inf
+        else:
+            return result
+
+
+# This function runs a search at depth 1, 2, 3 and so on until the time limit (in seconds) runs out.
+# Every iteration searches the principal variation of the previous one first. With a heuristic of PVS_HEURISTICS,
+# every iteration after the first searches with an aspiration window around the evaluation of the previous one.
+# An unfinished iteration is discarded. It returns the evaluation, best move, principal variation and depth
+# of the last completed iteration.
+# The search function can be replaced by one with the same arguments, such as parallel.parallel_search.
+# If given, report is called after every completed iteration with its depth, evaluation and best move.
+def iterative_deepening(context, position, time_limit, max_player, max_depth = 64, search_function = None,
+                        report = None):
+    # Initialize variables.
+    start_time = time()
+    deadline = start_time + time_limit
+    evaluation = position.evaluate_state()
+    best_move = None
+    variation = []
+    completed_depth = 0
+    search_function = search_function or alpha_beta
+    single_move = len(list(position.get_moves())) == 1
+    context.principal_variation.clear()
+
+    # Deepen the search one ply at a time.
+    for depth in range(1, max_depth + 1):
+        # Run the iteration. The first iteration always completes, so there is always a move to play.
+        context.deadline = deadline if depth > 1 else None
+        try:
+            if depth > 1 and context.heuristic in PVS_HEURISTICS and evaluation not in (inf, -inf):
+                iteration_evaluation = aspiration_search(context, position, depth, evaluation, max_player,
+                                                         search_function)
+            else:
+                iteration_evaluation = search_function(context, position, depth, -inf, inf, max_player)
+        except SearchTimeout:
+            break
+        finally:
+            context.deadline = None
+        evaluation = iteration_evaluation
+        best_move, variation = read_search_result(context, position, depth)
+        completed_depth = depth
+        if report is not None:
+            report(depth, evaluation, best_move)
+
+        # Seed the next iteration with the principal variation of this one.
+        context.principal_variation.clear()
+        context.principal_variation.update(variation_moves(position, variation))
+
+        # Stop if the result is decided, there is only one move or time is up.
+        if evaluation in (inf, -inf) or single_move or time() >= deadline:
+            break
+
+    # Record the search time.
+    if context.stats is not None:
+        context.stats.record_search(time() - start_time)
+
+    # Return the last completed result.
+    return evaluation, best_move, variation, completed_depth
+
+
+# This function is the search entry point for the game and for embedding code.
+# It searches for the side to move: the AI (o) maximizes the evaluation and the player (x) minimizes it.
+# The search uses the configuration of the context (a new one with the shared_variables defaults if not given):
+# without a time limit it searches to a fixed depth, otherwise it deepens until the time limit (in seconds) runs out.
+# With more than one worker, the root moves are searched in parallel. The history scores of earlier searches are aged.
+# It returns the evaluation, the best move and the principal variation. Moves are (source, destination, captured)
+# tuples and can be played with make_move.
+def search(position, context = None):
+    # Initialize variables.
+    context = context or SearchContext()
+    max_player = not position.get_turn()
+    context.new_search()
+    context.age_history()
+
+    # Pick the search function. The parallel search is imported here, since it depends on this module.
+    if context.workers > 1:
+        from .parallel import parallel_search
+        function = parallel_search
+    else:
+        function = alpha_beta
+
+    # Search to a fixed depth, or deepen until the time limit.
+    if context.time_limit is None:
+        start_time = time()
+        evaluation = function(context, position, context.depth, -inf, inf, max_player)
+        best_move, variation = read_search_result(context, position, context.depth)
+        if context.stats is not None:
+            context.stats.record_search(time() - start_time)
+    else:
+        evaluation, best_move, variation, _ = iterative_deepening(context, position, context.time_limit, max_player,
+                                                                  search_function = function)
+
+    # Return the result.
+    return evaluation, best_move, variation
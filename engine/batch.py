@@ -0,0 +1,105 @@
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+from . import bitboard
+
+
+# This module scores many boards at once with NumPy, e.g. the leaves of a wide search or the positions of a book or
+# benchmark suite. The scores are the board scores of bitboard.score_board, with the same weights: 50 for a man on a
+# center square, 45 for a man on a forward square, 40 for any other man and 60 for a king.
+# Boards are packed into one array in either layout:
+#   bitboards  N x 3 unsigned integers: the x pieces, o pieces and kings of every board (see bitboard.py).
+#   squares    N x 32 int8: the piece on every square, as EMPTY or a piece kind + 1 (see SQUARE_CODES).
+# NumPy is optional. Without it the module still imports, but its functions raise ImportError.
+
+# Square codes of the squares layout: 0 is an empty square, and every piece kind of bitboard.py is its kind + 1.
+EMPTY = 0
+SQUARE_CODES = {
+    'x': bitboard.X_MAN + 1,
+    'X': bitboard.X_KING + 1,
+    'o': bitboard.O_MAN + 1,
+    'O': bitboard.O_KING + 1,
+}
+
+# Value of every square code on every square, indexed by [code][square], and of every byte of the pieces of a kind,
+# indexed by [kind][byte][value]. They are built from bitboard.PIECE_VALUES, so both scores always agree.
+if numpy is not None:
+    SQUARE_VALUES = numpy.array([[0] * 32] + bitboard.PIECE_VALUES, dtype = numpy.int32)
+    BYTE_VALUES = numpy.array([[[sum(values[8 * byte + bit] for bit in range(8) if value >> bit & 1)
+                                 for value in range(256)] for byte in range(4)] for values in bitboard.PIECE_VALUES],
+                              dtype = numpy.int32)
+    SQUARE_INDEX = numpy.arange(32, dtype = numpy.int64)
+    SQUARE_SHIFTS = numpy.arange(32, dtype = numpy.uint32)
+
+
+# This function raises ImportError if NumPy is not installed.
+def require_numpy():
+    if numpy is None:
+        raise ImportError("batch evaluation needs NumPy (pip install numpy)")
+
+
+# This function packs positions (State or Board objects) into an N x 3 uint32 array of bitboards.
+def pack_bitboards(positions):
+    require_numpy()
+    return numpy.array([position.get_bitboards() for position in positions], dtype = numpy.uint32).reshape(-1, 3)
+
+
+# This function converts an N x 3 array of bitboards into the N x 32 int8 squares layout.
+def bitboards_to_squares(bitboards):
+    require_numpy()
+    bits = unpack_bitboards(bitboards)
+    x_pieces, o_pieces, kings = bits[:, 0], bits[:, 1], bits[:, 2]
+    squares = (x_pieces & ~kings) * SQUARE_CODES['x'] + (x_pieces & kings) * SQUARE_CODES['X']
+    squares += (o_pieces & ~kings) * SQUARE_CODES['o'] + (o_pieces & kings) * SQUARE_CODES['O']
+    return squares.astype(numpy.int8)
+
+
+# This function splits every bitboard into its 32 squares. It returns an N x 3 x 32 bool array.
+def unpack_bitboards(bitboards):
+    bitboards = numpy.asarray(bitboards, dtype = numpy.uint32)
+    return ((bitboards[:, :, None] >> SQUARE_SHIFTS) & 1).astype(bool)
+
+
+# This function returns the board score of every board of an N x 3 bitboard array, as an int32 array.
+# The pieces of every kind are split into bytes, and the value of every byte is looked up in BYTE_VALUES.
+def score_bitboards(bitboards):
+    # Split the boards into the pieces of every kind.
+    require_numpy()
+    bitboards = numpy.asarray(bitboards, dtype = numpy.uint32)
+    x_pieces, o_pieces, kings = bitboards[:, 0], bitboards[:, 1], bitboards[:, 2]
+    groups = ((bitboard.X_MAN, x_pieces & ~kings), (bitboard.X_KING, x_pieces & kings),
+              (bitboard.O_MAN, o_pieces & ~kings), (bitboard.O_KING, o_pieces & kings))
+
+    # Add up the values of every byte of every kind.
+    scores = numpy.zeros(len(bitboards), dtype = numpy.int32)
+    for kind, pieces in groups:
+        for byte in range(4):
+            scores += BYTE_VALUES[kind, byte][(pieces >> (8 * byte)) & 0xFF]
+
+    # Return the scores.
+    return scores
+
+
+# This function returns the board score of every board of an N x 32 squares array, as an int32 array.
+def score_squares(squares):
+    require_numpy()
+    squares = numpy.asarray(squares, dtype = numpy.int64)
+    return SQUARE_VALUES[squares, SQUARE_INDEX].sum(axis = 1, dtype = numpy.int32)
+
+
+# This function evaluates every board of an N x 3 bitboard array like bitboard.evaluate, as a float array.
+# A board where the player has no pieces is won by the AI (inf), and one where the AI has none is lost (-inf).
+def evaluate_bitboards(bitboards):
+    require_numpy()
+    bitboards = numpy.asarray(bitboards, dtype = numpy.uint32)
+    evaluations = score_bitboards(bitboards).astype(numpy.float64)
+    evaluations[bitboards[:, 1] == 0] = -numpy.inf
+    evaluations[bitboards[:, 0] == 0] = numpy.inf
+    return evaluations
+
+
+# This function evaluates positions (State or Board objects) in one pass. It returns a float array.
+def evaluate_positions(positions):
+    return evaluate_bitboards(pack_bitboards(positions))
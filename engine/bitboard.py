@@ -0,0 +1,387 @@
+from math import inf
+
+
+# This module implements the 32-square bitboard used by State.
+# The playable squares are numbered row by row, so square = row * 4 + column // 2.
+# Even rows hold the odd columns (1, 3, 5, 7) and odd rows hold the even columns (0, 2, 4, 6).
+# A position is three integers: the x pieces (player), the o pieces (AI) and the kings of both sides.
+
+
+# Board masks.
+FULL = 0xFFFFFFFF
+EVEN_ROWS = 0x0F0F0F0F
+ODD_ROWS = 0xF0F0F0F0
+LEFT_COLUMN = 0x10101010
+RIGHT_COLUMN = 0x08080808
+TOP_ROW = 0x0000000F
+BOTTOM_ROW = 0xF0000000
+
+# Start position. The AI (o) men fill rows 0 to 2 and the player (x) men fill rows 5 to 7.
+START_X_PIECES = 0xFFF00000
+START_O_PIECES = 0x00000FFF
+
+# Evaluation masks. The center squares are rows 3 and 4, columns 2 to 5.
+CENTER = 0x00066000
+X_FORWARD = 0x0000FFFF & ~CENTER
+O_FORWARD = 0xFFFF0000 & ~CENTER
+
+# Piece weights used by the evaluation.
+MAN_WEIGHT = 40
+FORWARD_BONUS = 5
+CENTER_BONUS = 10
+KING_WEIGHT = 60
+
+
+# This function converts a square index to table coordinates.
+def square_to_coordinates(square):
+    row = square // 4
+    return row, 2 * (square % 4) + (1 if row % 2 == 0 else 0)
+
+
+# This function converts table coordinates to a square index. It returns -1 for non-playable squares.
+def coordinates_to_square(row, column):
+    if not (0 <= row < 8 and 0 <= column < 8) or column % 2 != (row + 1) % 2:
+        return -1
+    return row * 4 + column // 2
+
+
+# These functions shift every piece of a bitboard one step in the given direction.
+# Pieces that would leave the board are dropped.
+def down_left(board):
+    return ((board & EVEN_ROWS) << 4 | (board & ODD_ROWS & ~LEFT_COLUMN) << 3) & FULL
+
+
+def down_right(board):
+    return ((board & EVEN_ROWS & ~RIGHT_COLUMN) << 5 | (board & ODD_ROWS) << 4) & FULL
+
+
+def up_left(board):
+    return (board & EVEN_ROWS) >> 4 | (board & ODD_ROWS & ~LEFT_COLUMN) >> 5
+
+
+def up_right(board):
+    return (board & EVEN_ROWS & ~RIGHT_COLUMN) >> 3 | (board & ODD_ROWS) >> 4
+
+
+# Directions in generation order, paired with the shift that reverses them.
+# Down moves towards row 7 (AI men), up moves towards row 0 (player men).
+ALL_DIRECTIONS = ((down_left, up_right), (down_right, up_left), (up_left, down_right), (up_right, down_left))
+
+
+# This function builds the per-square step and jump landing tables for one direction.
+def build_tables(shift):
+    steps = []
+    jumps = []
+    for square in range(32):
+        target = shift(1 << square)
+        steps.append(target)
+        jumps.append(shift(target))
+    return steps, jumps
+
+
+# Per-square lookup tables, indexed by [direction][square]. Directions are down-left, down-right, up-left, up-right.
+STEPS = []
+JUMPS = []
+for _shift, _ in ALL_DIRECTIONS:
+    _steps, _jumps = build_tables(_shift)
+    STEPS.append(_steps)
+    JUMPS.append(_jumps)
+
+# Direction indices a piece may use. Kings move both ways.
+DOWN = (0, 1)
+UP = (2, 3)
+BOTH = (0, 1, 2, 3)
+
+
+# This function iterates through the set squares of a bitboard in ascending order.
+def squares(board):
+    while board:
+        low = board & -board
+        yield low.bit_length() - 1
+        board ^= low
+
+
+# This function converts a table to bitboards.
+def table_to_bitboards(table):
+    # Initialize variables.
+    x_pieces = 0
+    o_pieces = 0
+    kings = 0
+
+    # Iterate through the playable squares and set the bits.
+    for square in range(32):
+        row, column = square_to_coordinates(square)
+        field = table[row][column]
+        if field == 'x' or field == 'X':
+            x_pieces |= 1 << square
+        if field == 'o' or field == 'O':
+            o_pieces |= 1 << square
+        if field == 'X' or field == 'O':
+            kings |= 1 << square
+
+    # Return bitboards.
+    return x_pieces, o_pieces, kings
+
+
+# This function converts bitboards to a table.
+def bitboards_to_table(x_pieces, o_pieces, kings):
+    # Initialize variable.
+    table = [['-'] * 8 for _ in range(8)]
+
+    # Iterate through the occupied squares and place the pieces.
+    for square in squares(x_pieces | o_pieces):
+        row, column = square_to_coordinates(square)
+        bit = 1 << square
+        field = 'x' if x_pieces & bit else 'o'
+        table[row][column] = field.upper() if kings & bit else field
+
+    # Return table.
+    return table
+
+
+# This function splits the bitboards into the side to move, its opponent and the directions its men use.
+# The player (x) moves first and its men move up. The AI (o) men move down.
+def own_and_opponent(x_pieces, o_pieces, turn):
+    if turn:
+        return x_pieces, o_pieces, UP
+    return o_pieces, x_pieces, DOWN
+
+
+# This function returns the squares holding a piece of the side to move that can capture.
+def find_jumpers(x_pieces, o_pieces, kings, turn):
+    # Initialize variables.
+    own, opponent, forward = own_and_opponent(x_pieces, o_pieces, turn)
+    empty = ~(x_pieces | o_pieces) & FULL
+    own_kings = own & kings
+    jumpers = 0
+
+    # Shift the pieces over an opponent piece onto an empty square, then shift the landings back.
+    for direction, (shift, back) in enumerate(ALL_DIRECTIONS):
+        pieces = own if direction in forward else own_kings
+        if pieces:
+            landing = shift(shift(pieces) & opponent) & empty
+            jumpers |= back(back(landing))
+
+    # Return capturing pieces.
+    return jumpers
+
+
+# This function returns the squares holding a piece of the side to move that has a non-capturing move.
+def find_movers(x_pieces, o_pieces, kings, turn):
+    # Initialize variables.
+    own, _, forward = own_and_opponent(x_pieces, o_pieces, turn)
+    empty = ~(x_pieces | o_pieces) & FULL
+    own_kings = own & kings
+    movers = 0
+
+    # Shift the pieces onto empty squares, then shift the targets back.
+    for direction, (shift, back) in enumerate(ALL_DIRECTIONS):
+        pieces = own if direction in forward else own_kings
+        if pieces:
+            movers |= back(shift(pieces) & empty)
+
+    # Return moving pieces.
+    return movers
+
+
+# This function yields the capture sequences of a piece standing on the square as (destination, captured) pairs.
+# It works depth first on the bitboards, so no board is copied between jumps. A piece must keep jumping while it
+# can. A jumped piece stays on the board until the move is over, so it blocks landings but cannot be jumped twice.
+# A man reaching the crown row is promoted and its move ends there.
+def capture_sequences(square, opponent, empty, directions, crown, captured = 0):
+    # Initialize variable.
+    jumped = False
+
+    # Jump over every adjacent opponent piece onto an empty square, then continue from the landing square.
+    for direction in directions:
+        target = STEPS[direction][square]
+        if target & opponent:
+            landing = JUMPS[direction][square]
+            if landing & empty:
+                jumped = True
+                if landing & crown:
+                    yield landing.bit_length() - 1, captured | target
+                else:
+                    yield from capture_sequences(landing.bit_length() - 1, opponent ^ target, empty, directions,
+                                                 crown, captured | target)
+
+    # The sequence ends here if no jump was possible.
+    if not jumped and captured:
+        yield square, captured
+
+
+# This function lists the moves of a single piece as (source, destination, captured) tuples.
+# Captured is the bitboard of the pieces jumped by the whole capture sequence, or 0 for a non-capturing move.
+# If the piece can capture, only its capture sequences are returned.
+def piece_moves(x_pieces, o_pieces, kings, square):
+    # Initialize variables.
+    bit = 1 << square
+    if x_pieces & bit:
+        opponent = o_pieces
+        directions, crown = (BOTH, 0) if kings & bit else (UP, TOP_ROW)
+    elif o_pieces & bit:
+        opponent = x_pieces
+        directions, crown = (BOTH, 0) if kings & bit else (DOWN, BOTTOM_ROW)
+    else:
+        return []
+    empty = ~(x_pieces | o_pieces) & FULL
+    captures = []
+
+    # Find the capture sequences. The square the piece leaves is empty during the sequence.
+    # Different paths with the same landing square and captured pieces are the same move, so they are listed once.
+    for destination, captured in capture_sequences(square, opponent, empty | bit, directions, crown):
+        move = (square, destination, captured)
+        if move not in captures:
+            captures.append(move)
+
+    # Capturing moves list is not empty, return the list.
+    if captures:
+        return captures
+
+    # Otherwise, return all moves.
+    return [(square, STEPS[direction][square].bit_length() - 1, 0) for direction in directions
+            if STEPS[direction][square] & empty]
+
+
+# This function yields the legal moves of the side to move one at a time. Captures are mandatory.
+def iterate_moves(x_pieces, o_pieces, kings, turn):
+    # Only pieces that can capture may move if there is any capture.
+    pieces = find_jumpers(x_pieces, o_pieces, kings, turn)
+    if not pieces:
+        pieces = find_movers(x_pieces, o_pieces, kings, turn)
+
+    # Yield the moves of each piece in square order.
+    for square in squares(pieces):
+        yield from piece_moves(x_pieces, o_pieces, kings, square)
+
+
+# This function lists the legal moves of the side to move.
+def generate_moves(x_pieces, o_pieces, kings, turn):
+    return list(iterate_moves(x_pieces, o_pieces, kings, turn))
+
+
+# This function applies a move and returns the new bitboards. Men reaching the last row are promoted.
+def apply_move(x_pieces, o_pieces, kings, move):
+    # Initialize variables.
+    source, destination, captured = move
+    source_bit = 1 << source
+    destination_bit = 1 << destination
+    moved = source_bit ^ destination_bit
+
+    # Move the piece and remove the captured pieces. A king can end a capture sequence on its own square.
+    if x_pieces & source_bit:
+        x_pieces ^= moved
+        o_pieces &= ~captured
+        promoted = destination_bit & TOP_ROW
+    else:
+        o_pieces ^= moved
+        x_pieces &= ~captured
+        promoted = destination_bit & BOTTOM_ROW
+    if kings & source_bit:
+        kings ^= moved
+    kings = (kings & ~captured) | promoted
+
+    # Return bitboards.
+    return x_pieces, o_pieces, kings
+
+
+# Move codes. A move is stored as one int: the source square in bits 0 to 4, the destination square in bits 5 to 9,
+# the promotion flag in bit 10 and the captured squares from bit 11 up. Moves without captures fit in a small int.
+SQUARE_MASK = 0x1F
+DESTINATION_SHIFT = 5
+PROMOTION = 1 << 10
+CAPTURED_SHIFT = 11
+
+
+# This function encodes a move played on a board with the given kings. A man reaching the last row is promoted, and
+# men only move forward, so a man landing on the top or bottom row always reaches its own last row.
+def encode_move(move, kings):
+    source, destination, captured = move
+    code = source | destination << DESTINATION_SHIFT | captured << CAPTURED_SHIFT
+    if not kings >> source & 1 and (1 << destination) & (TOP_ROW | BOTTOM_ROW):
+        code |= PROMOTION
+    return code
+
+
+# This function decodes a move code into its (source, destination, captured) tuple.
+def decode_move(code):
+    return code & SQUARE_MASK, code >> DESTINATION_SHIFT & SQUARE_MASK, code >> CAPTURED_SHIFT
+
+
+# This function scores the men of one side, favoring forward and center squares.
+def score_men(men, forward):
+    return (MAN_WEIGHT * men.bit_count() + FORWARD_BONUS * (men & forward).bit_count()
+            + CENTER_BONUS * (men & CENTER).bit_count())
+
+
+# This function scores a board from the AI's side from scratch: the AI score minus the player score.
+def score_board(x_pieces, o_pieces, kings):
+    x_kings = x_pieces & kings
+    o_kings = o_pieces & kings
+    p1_score = score_men(x_pieces ^ x_kings, X_FORWARD) + KING_WEIGHT * x_kings.bit_count()
+    p2_score = score_men(o_pieces ^ o_kings, O_FORWARD) + KING_WEIGHT * o_kings.bit_count()
+    return p2_score - p1_score
+
+
+# Piece kinds. They index the piece value table here and the key table in zobrist.py.
+X_MAN = 0
+X_KING = 1
+O_MAN = 2
+O_KING = 3
+
+# Contribution of every piece kind on every square to the board score, indexed by [kind][square].
+# Player pieces count negative, since the score is from the AI's side.
+PIECE_VALUES = [
+    [-score_men(1 << square, X_FORWARD) for square in range(32)],
+    [-KING_WEIGHT] * 32,
+    [score_men(1 << square, O_FORWARD) for square in range(32)],
+    [KING_WEIGHT] * 32,
+]
+
+
+# This function returns the change of the board score caused by a move played on the given board.
+# It only looks at the moving piece, the captured pieces and the promotion, so it does not rescan the board.
+def move_delta(x_pieces, o_pieces, kings, move):
+    # Initialize variables.
+    source, destination, captured = move
+    source_bit = 1 << source
+
+    # Find the kinds of the moving piece and of the captured pieces.
+    if x_pieces & source_bit:
+        man, king, opponent_man, opponent_king = X_MAN, X_KING, O_MAN, O_KING
+        promoted = (1 << destination) & TOP_ROW
+    else:
+        man, king, opponent_man, opponent_king = O_MAN, O_KING, X_MAN, X_KING
+        promoted = (1 << destination) & BOTTOM_ROW
+
+    # Move the piece. It becomes a king if promoted.
+    if kings & source_bit:
+        delta = PIECE_VALUES[king][destination] - PIECE_VALUES[king][source]
+    else:
+        delta = PIECE_VALUES[king if promoted else man][destination] - PIECE_VALUES[man][source]
+
+    # Remove the captured pieces. Most moves capture at most one piece, so that case skips the square loop.
+    if captured & (captured - 1) == 0:
+        if captured:
+            square = captured.bit_length() - 1
+            delta -= PIECE_VALUES[opponent_king if kings & captured else opponent_man][square]
+        return delta
+    for square in squares(captured):
+        delta -= PIECE_VALUES[opponent_king if kings & (1 << square) else opponent_man][square]
+
+    # Return the change.
+    return delta
+
+
+# This function evaluates a board from the AI's side, given its board score.
+# It implements the Control the Center Strategy.
+# Reference used, https://hobbylark.com/board-games/Checkers-Strategy-Tactics-How-To-Win.
+def evaluate(x_pieces, o_pieces, score):
+    # If a player has no more pieces, game is over.
+    if not x_pieces:
+        return inf
+    if not o_pieces:
+        return -inf
+
+    # Return the board score.
+    return score
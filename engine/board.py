@@ -0,0 +1,81 @@
+from . import bitboard
+from . import zobrist
+
+
+# This class represents a mutable board for make/unmake search.
+# Moves are played in place and undone from a stack, so a search only keeps one board and its undo history.
+class Board(object):
+    __slots__ = ('x_pieces', 'o_pieces', 'kings', 'turn', 'key', 'score', 'evaluation', 'history')
+
+    # This is a constructor. It initializes object variables.
+    # The Zobrist key and the board score are computed from scratch unless they are passed in.
+    def __init__(self, x_pieces, o_pieces, kings, turn, key = None, score = None):
+        if key is None:
+            key = zobrist.compute_key(x_pieces, o_pieces, kings, turn)
+        if score is None:
+            score = bitboard.score_board(x_pieces, o_pieces, kings)
+        self.x_pieces = x_pieces
+        self.o_pieces = o_pieces
+        self.kings = kings
+        self.turn = turn
+        self.key = key
+        self.score = score
+        self.evaluation = 0
+        self.history = []
+
+    # This returns whether the game is over, meaning one of the players has no more pieces.
+    def get_game_end(self):
+        return not self.x_pieces or not self.o_pieces
+
+    # This returns the turn boolean flag.
+    def get_turn(self):
+        return self.turn
+
+    # This updates the board evaluation to the given parameter.
+    def set_evaluation(self, value):
+        self.evaluation = value
+
+    # This returns the board evaluation.
+    def get_evaluation(self):
+        return self.evaluation
+
+    # This returns the Zobrist key of the board.
+    def get_key(self):
+        return self.key
+
+    # This returns the board score of the board, from the AI's side and without the game over check.
+    def get_score(self):
+        return self.score
+
+    # This returns the bitboards of the board.
+    def get_bitboards(self):
+        return self.x_pieces, self.o_pieces, self.kings
+
+    # This function evaluates the board from the AI's side. The board score is updated by every move.
+    def evaluate_state(self):
+        self.evaluation = bitboard.evaluate(self.x_pieces, self.o_pieces, self.score)
+        return self.evaluation
+
+    # This returns a generator over the legal moves. Moves are generated lazily, one at a time.
+    def get_moves(self):
+        return bitboard.iterate_moves(self.x_pieces, self.o_pieces, self.kings, self.turn)
+
+    # This function plays the move on the board and returns the board.
+    def make_move(self, move):
+        # Save the current board on the undo stack.
+        self.history.append((self.x_pieces, self.o_pieces, self.kings, self.key, self.score))
+
+        # Update the key and score before the bitboards, since they need the pieces before the move.
+        self.key = zobrist.update_key(self.key, self.x_pieces, self.o_pieces, self.kings, move)
+        self.score += bitboard.move_delta(self.x_pieces, self.o_pieces, self.kings, move)
+        self.x_pieces, self.o_pieces, self.kings = bitboard.apply_move(self.x_pieces, self.o_pieces,
+                                                                       self.kings, move)
+        self.turn = not self.turn
+
+        # Return board.
+        return self
+
+    # This function takes back the last move played.
+    def unmake_move(self):
+        self.x_pieces, self.o_pieces, self.kings, self.key, self.score = self.history.pop()
+        self.turn = not self.turn
@@ -0,0 +1,115 @@
+import argparse
+import json
+from math import inf
+from random import Random
+from time import time
+
+from . import shared_variables
+from . import ai
+from .bitboard import START_O_PIECES, START_X_PIECES
+from .context import SearchContext
+from .state import State
+
+
+# This module implements the opening book. The book maps the Zobrist key of a position with the AI to move onto
+# weighted moves. It is built offline by deep searches (see build) and stored as JSON.
+
+
+# This function reads a book file. It returns a dictionary of key to (move, weight) lists, which is empty if there
+# is no such file.
+def load(path):
+    try:
+        with open(path) as file:
+            entries = json.load(file)
+    except FileNotFoundError:
+        return {}
+    return {int(key): [((source, destination, captured), weight) for source, destination, captured, weight in moves]
+            for key, moves in entries.items()}
+
+
+# This function writes a book to a file.
+def save(book, path):
+    entries = {str(key): [list(move) + [weight] for move, weight in moves] for key, moves in book.items()}
+    with open(path, 'w') as file:
+        json.dump(entries, file, indent = 1, sort_keys = True)
+
+
+# This function picks a book move of the position, at random by weight. It returns None if the position is not in
+# the book. Moves that are not legal in the position (e.g. after a key collision) are left out.
+def choose_move(book, position, random = None):
+    # Look up the position.
+    entries = book.get(position.get_key())
+    if not entries:
+        return None
+    legal_moves = set(position.get_moves())
+    entries = [(move, weight) for move, weight in entries if move in legal_moves]
+    if not entries:
+        return None
+
+    # Pick a move.
+    random = random or Random()
+    return random.choices([move for move, _ in entries], [weight for _, weight in entries])[0]
+
+
+# This function scores every move of the position by a search to the given depth, from the AI's side.
+# It returns the moves that score within the margin of the best one, with weights that favor the better moves.
+def search_book_moves(context, position, margin):
+    # Search every move with a full window, so every score is exact.
+    scores = []
+    for move in position.get_moves():
+        child = position.make_move(move)
+        scores.append((ai.alpha_beta(context, child, context.depth - 1, -inf, inf, False, 1), move))
+        position.unmake_move()
+
+    # Keep the good moves.
+    best_score = max(score for score, _ in scores)
+    return [(move, int(margin - (best_score - score)) + 1) for score, move in scores if best_score - score <= margin]
+
+
+# This function builds a book for the first plies of the game, starting with the player's move.
+# Every position with the AI to move is searched, and every reply of the player is followed.
+def build(plies, depth, heuristic, margin):
+    # Initialize variables.
+    context = SearchContext(depth, heuristic)
+    book = {}
+    positions = [State(turn = True, bitboards = (START_X_PIECES, START_O_PIECES, 0))]
+
+    # Expand the game tree one ply at a time.
+    for ply in range(plies):
+        next_positions = {}
+        for position in positions:
+            if position.get_game_end():
+                continue
+            if position.get_turn():
+                moves = position.get_moves()
+            else:
+                book[position.get_key()] = search_book_moves(context, position, margin)
+                moves = [move for move, _ in book[position.get_key()]]
+            for move in moves:
+                child = position.make_move(move)
+                next_positions[child.get_key()] = child
+        positions = list(next_positions.values())
+        print("Ply %d: %d positions in book" % (ply + 1, len(book)))
+
+    # Return the book.
+    return book
+
+
+# This function parses the command line and builds an opening book.
+def main():
+    parser = argparse.ArgumentParser(description = "Builds an opening book by deep searches.")
+    parser.add_argument('--plies', type = int, default = 4, help = "plies of the game covered by the book")
+    parser.add_argument('--depth', type = int, default = 10, help = "search depth of every book position")
+    parser.add_argument('--heuristic', default = shared_variables.HEURISTIC)
+    parser.add_argument('--margin', type = int, default = 5, help = "score margin of the moves kept")
+    parser.add_argument('--output', default = shared_variables.BOOK_PATH)
+    arguments = parser.parse_args()
+
+    start_time = time()
+    book = build(arguments.plies, arguments.depth, arguments.heuristic, arguments.margin)
+    save(book, arguments.output)
+    print("Positions: %d, time: %.1f s" % (len(book), time() - start_time))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,131 @@
+import os
+
+from . import shared_variables
+from .tablebase import load
+from .transposition import TranspositionTable
+
+
+# The endgame tablebases opened so far, by absolute path (see get_tablebase). They are only read, so all contexts
+# share them.
+TABLEBASES = {}
+
+# Number of nodes between two checks of the search deadline.
+DEADLINE_CHECK_INTERVAL = 1024
+
+
+# This function returns the endgame tablebase of a file, opening it on first use. It is None if it was not built
+# (see tablebase.py).
+def get_tablebase(path):
+    path = os.path.abspath(path)
+    if path not in TABLEBASES:
+        TABLEBASES[path] = load(path)
+    return TABLEBASES[path]
+
+
+# This class holds everything a search changes: its tables, counters and limits, with its configuration.
+# Every game (or other caller) owns a context and passes it to the search, so searches of different games
+# do not share state. The configuration defaults to shared_variables. The tablebase is True for the one at
+# shared_variables.TABLEBASE_PATH, the path of a file, its entry of get_config, or None to search without one.
+class SearchContext(object):
+    # This is a constructor. It initializes the configuration, tables, counters and limits.
+    def __init__(self, depth = None, heuristic = None, time_limit = None, workers = None, search_mode = None,
+                 quiescence = None, quiescence_nodes = None, tt_size_mb = None, cache_limit = None,
+                 tablebase = True, stats = None):
+        # Configuration.
+        self.depth = depth or shared_variables.DEPTH
+        self.heuristic = heuristic or shared_variables.HEURISTIC
+        self.time_limit = time_limit
+        self.workers = workers or shared_variables.WORKERS
+        self.search_mode = search_mode or shared_variables.SEARCH_MODE
+        self.quiescence = shared_variables.QUIESCENCE if quiescence is None else quiescence
+        self.quiescence_nodes = quiescence_nodes or shared_variables.QUIESCENCE_NODES
+        self.tt_size_mb = tt_size_mb or shared_variables.TT_SIZE_MB
+        self.cache_limit = cache_limit or shared_variables.CACHE_LIMIT
+        if tablebase is True:
+            tablebase = shared_variables.TABLEBASE_PATH
+        elif isinstance(tablebase, dict):
+            tablebase = tablebase['path']
+        self.tablebase = get_tablebase(tablebase) if tablebase is not None else None
+
+        # Statistics collector (see stats.py), or None to not collect statistics.
+        self.stats = stats
+
+        # Tables. The history table maps a move onto a score. The killer list holds the two last moves that caused
+        # a cutoff at every ply. The principal variation maps a position key to its best move from the last
+        # completed iteration of iterative deepening.
+        self.transposition_table = TranspositionTable(self.tt_size_mb)
+        self.history_table = {}
+        self.killer_moves = []
+        self.principal_variation = {}
+        self.cache = set()
+
+        # Counters.
+        self.nodes = 0
+        self.cutoffs = 0
+        self.cache_peak = 0
+        self.time = 0.0
+        self.tablebase_hits = 0
+        self.book_hits = 0
+        self.ponder_hits = 0
+
+        # Limits. The deadline is a time() value or None. Setting stop asks a running search to stop, e.g. from
+        # another thread. The countdowns hold the nodes left until the next deadline check and the quiescence
+        # nodes left for the horizon node being searched.
+        self.deadline = None
+        self.stop = False
+        self.deadline_countdown = DEADLINE_CHECK_INTERVAL
+        self.quiescence_countdown = 0
+
+    # This returns the configuration, so an equal context can be created elsewhere (e.g. in a worker process).
+    # The tablebase is given by its path and number of pieces, or None.
+    def get_config(self):
+        tablebase = None
+        if self.tablebase is not None:
+            tablebase = {'path': self.tablebase.get_path(), 'pieces': self.tablebase.get_pieces()}
+        return {
+            'depth': self.depth,
+            'heuristic': self.heuristic,
+            'time_limit': self.time_limit,
+            'workers': self.workers,
+            'search_mode': self.search_mode,
+            'quiescence': self.quiescence,
+            'quiescence_nodes': self.quiescence_nodes,
+            'tt_size_mb': self.tt_size_mb,
+            'cache_limit': self.cache_limit,
+            'tablebase': tablebase,
+        }
+
+    # This resets the node and cutoff counters.
+    def reset_counters(self):
+        self.nodes = 0
+        self.cutoffs = 0
+
+    # This empties the search cache and the killer slots and starts a new generation of the transposition table.
+    # It is called before every search.
+    def new_search(self):
+        self.cache.clear()
+        self.killer_moves.clear()
+        self.transposition_table.new_search()
+
+    # This halves every history score, so old searches weigh less than recent ones. Scores that reach 0 are removed.
+    def age_history(self):
+        for key, score in list(self.history_table.items()):
+            if score > 1:
+                self.history_table[key] = score // 2
+            else:
+                del self.history_table[key]
+
+    # This empties all tables and counters, e.g. for a new game.
+    def clear(self):
+        self.transposition_table.clear()
+        self.history_table.clear()
+        self.killer_moves.clear()
+        self.principal_variation.clear()
+        self.cache.clear()
+        self.nodes = 0
+        self.cutoffs = 0
+        self.cache_peak = 0
+        self.time = 0.0
+        self.tablebase_hits = 0
+        self.book_hits = 0
+        self.ponder_hits = 0
@@ -0,0 +1,108 @@
+# This module implements move ordering for the search. A move ordering is a list of stages. Every stage scores
+# a move and moves are sorted by the stage scores in order, so a later stage only breaks ties of the earlier ones.
+# The history table and killer slots belong to the search context (see context.py). Both are keyed by moves, the
+# (source, destination, captured) tuples of bitboard.py, so ordering never builds or hashes the positions they lead to.
+
+
+# Victim values for ordering captures.
+MAN_VALUE = 1
+KING_VALUE = 2
+
+
+# This function updates move history key with score. Creates new key if not yet present.
+def update_history(context, move, depth):
+    # Get the score of the move. It uses 0 if the move is not present.
+    score = context.history_table.get(move, 0)
+
+    # Add the square of the depth to the current score.
+    # Reference used, https://www.chessprogramming.org/History_Heuristic.
+    context.history_table[move] = score + 2 ** depth
+
+
+# This function stores a move that caused a cutoff in the killer slots of the ply.
+# Captures are left out, since they are ordered by their victims.
+# Reference used, https://www.chessprogramming.org/Killer_Heuristic.
+def update_killers(context, move, ply):
+    # Add empty slots up to the ply.
+    while len(context.killer_moves) <= ply:
+        context.killer_moves.append([None, None])
+
+    # Move the first killer to the second slot, unless the move is already the first killer.
+    killers = context.killer_moves[ply]
+    if not move[2] and killers[0] != move:
+        killers[1] = killers[0]
+        killers[0] = move
+
+
+# This function scores the hash move (best move stored for the position) above the others.
+def hash_stage(context, position, move, ply, hash_move):
+    return 1 if move == hash_move else 0
+
+
+# This function scores captures by their most valuable victim. Non-capturing moves score 0.
+def capture_stage(context, position, move, ply, hash_move):
+    captured = move[2]
+    if not captured:
+        return 0
+    kings = position.get_bitboards()[2]
+    return KING_VALUE * (captured & kings).bit_count() + MAN_VALUE * (captured & ~kings).bit_count()
+
+
+# This function scores the two killer moves of the ply, the first one higher.
+def killer_stage(context, position, move, ply, hash_move):
+    if ply >= len(context.killer_moves):
+        return 0
+    killers = context.killer_moves[ply]
+    if move == killers[0]:
+        return 2
+    if move == killers[1]:
+        return 1
+    return 0
+
+
+# This function scores the move by its history table score.
+def history_stage(context, position, move, ply, hash_move):
+    return context.history_table.get(move, 0)
+
+
+# Available stages and the stages of every heuristic. Heuristics not listed only search the hash move first.
+# PVS orders like HISTORY, so the two only differ by the search (see ai.PVS_HEURISTICS).
+STAGES = {
+    'hash': hash_stage,
+    'captures': capture_stage,
+    'killers': killer_stage,
+    'history': history_stage,
+}
+ORDERINGS = {
+    'HISTORY': ('hash', 'history'),
+    'KILLER': ('hash', 'captures', 'killers', 'history'),
+    'PVS': ('hash', 'history'),
+}
+
+
+# This function moves the hash move to the front of the move list.
+def order_hash_move(moves, hash_move):
+    moves = list(moves)
+    if hash_move in moves:
+        moves.remove(hash_move)
+        moves.insert(0, hash_move)
+    return moves
+
+
+# This function orders the moves for the heuristic of the context. Moves with equal scores keep their generation order.
+def order_moves(context, position, moves, ply, hash_move):
+    # Without stages, only the hash move is moved to the front. Otherwise, the moves are not touched, so they can
+    # still be generated lazily.
+    heuristic = context.heuristic
+    if heuristic not in ORDERINGS:
+        if hash_move is None:
+            return moves
+        return order_hash_move(moves, hash_move)
+
+    # Score every move with every stage and sort by the scores.
+    stages = [STAGES[name] for name in ORDERINGS[heuristic]]
+    scored = [([stage(context, position, move, ply, hash_move) for stage in stages], move) for move in moves]
+    scored.sort(key = lambda pair: pair[0], reverse = True)
+
+    # Return the sorted moves.
+    return [move for _, move in scored]
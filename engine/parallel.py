@@ -0,0 +1,142 @@
+from concurrent.futures import ProcessPoolExecutor, wait
+from math import inf
+
+from . import ai
+from .board import Board
+from .context import SearchContext
+
+
+# Create global process pool. It is created on first use and reused between searches.
+POOL = None
+POOL_WORKERS = 0
+
+# Search context of a worker process. It is kept between tasks, so a worker keeps its transposition table.
+WORKER_CONTEXT = None
+
+
+# This function returns the process pool, creating it if it does not have the given number of workers.
+def get_pool(workers):
+    global POOL, POOL_WORKERS
+    if POOL is None or POOL_WORKERS != workers:
+        shutdown_pool()
+        POOL = ProcessPoolExecutor(max_workers = workers)
+        POOL_WORKERS = workers
+    return POOL
+
+
+# This function stops the worker processes.
+def shutdown_pool():
+    global POOL, POOL_WORKERS
+    if POOL is not None:
+        POOL.shutdown(cancel_futures = True)
+    POOL = None
+    POOL_WORKERS = 0
+
+
+# This function returns the search context of the worker process, creating it if it has another configuration.
+def get_worker_context(config):
+    global WORKER_CONTEXT
+    if WORKER_CONTEXT is None or WORKER_CONTEXT.get_config() != config:
+        WORKER_CONTEXT = SearchContext(**config)
+    return WORKER_CONTEXT
+
+
+# This function searches one root move. It runs in a worker process, with a context of the same configuration as the
+# caller's, which takes over its deadline and principal variation.
+# It returns the evaluation, the node and cutoff counts of this task and the principal variation below the move.
+def search_root_move(config, bitboards, turn, key, move, depth, alpha, beta, max_player, deadline, variation):
+    # Reset the counters of the context and take over the deadline and principal variation of the caller.
+    context = get_worker_context(config)
+    context.reset_counters()
+    context.new_search()
+    context.deadline = deadline
+    context.principal_variation.clear()
+    context.principal_variation.update(variation)
+
+    # Play the move and search it.
+    board = Board(bitboards[0], bitboards[1], bitboards[2], turn, key)
+    board.make_move(move)
+    evaluation = ai.alpha_beta(context, board, depth - 1, alpha, beta, not max_player, 1)
+
+    # Return the result with the counters.
+    variation = ai.collect_principal_variation(context, board, depth - 1)
+    return evaluation, context.nodes, context.cutoffs, variation
+
+
+# This function is a parallel version of alpha_beta for the root position.
+# The first move is searched alone to get a bound, then the other moves are searched at the same time in the
+# process pool with that bound (young brothers wait). Counters of the workers are added to the context.
+# Like alpha_beta, it stores the root result in the transposition table and returns the root evaluation.
+def parallel_search(context, position, depth, alpha, beta, max_player, workers = None):
+    # Initialize variables.
+    pool = get_pool(workers or context.workers)
+    context.nodes += 1
+    if depth == 0 or position.get_game_end():
+        return position.evaluate_state()
+    moves = list(position.get_moves())
+    if not moves:
+        # The side to move is blocked and has lost, as in alpha_beta.
+        evaluation = -inf if max_player else inf
+        position.set_evaluation(evaluation)
+        return evaluation
+    arguments = (context.get_config(), position.get_bitboards(), position.get_turn(), position.get_key())
+    variation = dict(context.principal_variation)
+    deadline = context.deadline
+    original_alpha = alpha
+    original_beta = beta
+
+    # Search the principal variation move first, if any.
+    order = list(range(len(moves)))
+    first_move = variation.get(position.get_key())
+    for index in order:
+        if moves[index] == first_move:
+            order.remove(index)
+            order.insert(0, index)
+            break
+
+    # Search the first move alone.
+    results = {}
+    first = order[0]
+    results[first] = pool.submit(search_root_move, *arguments, moves[first], depth, alpha, beta, max_player,
+                                 deadline, variation).result()
+    if max_player:
+        alpha = max(alpha, results[first][0])
+    else:
+        beta = min(beta, results[first][0])
+
+    # Search the other moves in parallel with the narrowed window.
+    futures = {}
+    for index in order[1:]:
+        futures[pool.submit(search_root_move, *arguments, moves[index], depth, alpha, beta, max_player,
+                            deadline, variation)] = index
+    try:
+        for future in futures:
+            results[futures[future]] = future.result()
+    except ai.SearchTimeout:
+        for future in futures:
+            future.cancel()
+        wait(futures)
+        raise
+
+    # Merge the results. Ties go to the earlier move, as in alpha_beta.
+    best_index = None
+    for index in order:
+        evaluation, nodes, cutoffs, _ = results[index]
+        context.nodes += nodes
+        context.cutoffs += cutoffs
+        if best_index is None:
+            best_index = index
+        elif max_player and evaluation > results[best_index][0]:
+            best_index = index
+        elif not max_player and evaluation < results[best_index][0]:
+            best_index = index
+
+    # Store the result and the principal variation, so the next iteration can follow it.
+    best_evaluation = results[best_index][0]
+    best_move = moves[best_index]
+    position.set_evaluation(best_evaluation)
+    ai.store_transposition(context, position, depth, original_alpha, original_beta, best_evaluation, best_move)
+    ai.store_variation(context, position, [best_move] + results[best_index][3])
+
+    # Return the evaluation of the move.
+    return best_evaluation
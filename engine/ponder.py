@@ -0,0 +1,67 @@
+from math import inf
+from threading import Thread
+
+from . import ai
+from .state import State
+
+
+# This class searches the replies the player may play while the player is thinking (pondering).
+# The searches run in a background thread, one reply after another, starting with the expected reply.
+# Every finished search is kept, so the AI can play at once if the player plays a pondered reply.
+# The searches use the search context of the game, so they also fill its tables. Only one search may use a context
+# at a time, so pondering must be stopped before the AI searches.
+class Ponderer(object):
+    # This is a constructor. It takes the search context of the AI.
+    def __init__(self, context):
+        self.context = context
+        self.thread = None
+        self.results = {}
+
+    # This function starts pondering on a position with the player to move.
+    # The expected reply (e.g. from the principal variation of the last search) is searched first.
+    def start(self, position, expected_move = None):
+        # Search a copy of the position, so the game does not share states with the thread.
+        x_pieces, o_pieces, kings = position.get_bitboards()
+        position = State(turn = position.get_turn(), bitboards = (x_pieces, o_pieces, kings),
+                         key = position.get_key(), score = position.get_score())
+
+        # Order the replies.
+        moves = list(position.get_moves())
+        if expected_move in moves:
+            moves.remove(expected_move)
+            moves.insert(0, expected_move)
+
+        # Start the thread.
+        self.results = {}
+        self.context.stop = False
+        self.thread = Thread(target = self.run, args = (position, moves), daemon = True)
+        self.thread.start()
+
+    # This function searches the position after every reply, until all are searched or it is asked to stop.
+    def run(self, position, moves):
+        context = self.context
+        for move in moves:
+            # Search the reply like the AI would.
+            child = position.make_move(move)
+            if child.get_game_end():
+                continue
+            context.new_search()
+            if context.time_limit is None:
+                evaluation, best_move, variation, _ = ai.iterative_deepening(context, child, inf, True, context.depth)
+            else:
+                evaluation, best_move, variation, _ = ai.iterative_deepening(context, child, context.time_limit, True)
+
+            # A search cut short by stop() is not finished, so it is not kept.
+            if context.stop:
+                return
+            self.results[child.get_key()] = (evaluation, best_move, variation)
+
+    # This function stops pondering and waits for the thread. It returns the pondered search result of the position
+    # the player reached, or None if it was not searched to the end.
+    def stop(self, position):
+        if self.thread is not None:
+            self.context.stop = True
+            self.thread.join()
+            self.context.stop = False
+            self.thread = None
+        return self.results.get(position.get_key())
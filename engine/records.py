@@ -0,0 +1,263 @@
+import argparse
+import os
+import struct
+
+from . import bitboard
+
+
+# This module reads and writes positions and games in compact binary files.
+#
+# A position is (x_pieces, o_pieces, kings, turn), with the bitboards of bitboard.py and turn True when x is to move.
+# It is encoded in 4 + ceil((2n + 1) / 8) bytes, where n is the number of pieces: the bitboard of occupied squares,
+# then one bit for the side to move and two bits per piece (its kind, see bitboard.X_MAN), from the lowest square up.
+# The start position takes 11 bytes and an endgame with 6 pieces takes 6. The length follows from the occupied
+# squares, so positions can be read one after another without a length field.
+#
+# A move is encoded in 2 bytes, the source and destination squares, with 4 more bytes for the captured squares of a
+# capture (flagged in the source byte).
+#
+# Files start with a header of a magic and a version. A position file holds positions one after another.
+# A game file holds games one after another: the result, the number of moves, the start position and the moves.
+# Readers are generators and writers take any iterable, so files of millions of positions are streamed.
+
+# File layout.
+POSITIONS_MAGIC = b'CKPS'
+GAMES_MAGIC = b'CKGR'
+VERSION = 1
+HEADER = struct.Struct('<4sH')
+OCCUPIED = struct.Struct('<I')
+GAME = struct.Struct('<BH')
+MOVE = struct.Struct('<BB')
+CAPTURED = struct.Struct('<I')
+CAPTURE_FLAG = 0x80
+
+# Game results.
+UNKNOWN = 0
+X_WIN = 1
+O_WIN = 2
+DRAW = 3
+
+
+# This function encodes a position.
+def encode_position(x_pieces, o_pieces, kings, turn):
+    # Pack the side to move and the kind of every piece.
+    occupied = x_pieces | o_pieces
+    kinds = int(turn)
+    shift = 1
+    for square in bitboard.squares(occupied):
+        bit = 1 << square
+        if o_pieces & bit:
+            kind = bitboard.O_KING if kings & bit else bitboard.O_MAN
+        else:
+            kind = bitboard.X_KING if kings & bit else bitboard.X_MAN
+        kinds |= kind << shift
+        shift += 2
+
+    # Return the bytes.
+    return OCCUPIED.pack(occupied) + kinds.to_bytes((shift + 7) // 8, 'little')
+
+
+# This function returns the number of bytes of the kinds of a position with the occupied squares.
+def kinds_size(occupied):
+    return (2 * occupied.bit_count() + 8) // 8
+
+
+# This function decodes the kinds of a position with the occupied squares.
+def decode_kinds(occupied, data):
+    # Initialize variables.
+    kinds = int.from_bytes(data, 'little')
+    turn = bool(kinds & 1)
+    kinds >>= 1
+    x_pieces = o_pieces = kings = 0
+
+    # Place every piece.
+    for square in bitboard.squares(occupied):
+        bit = 1 << square
+        kind = kinds & 3
+        kinds >>= 2
+        if kind == bitboard.X_MAN or kind == bitboard.X_KING:
+            x_pieces |= bit
+        else:
+            o_pieces |= bit
+        if kind == bitboard.X_KING or kind == bitboard.O_KING:
+            kings |= bit
+
+    # Return position.
+    return x_pieces, o_pieces, kings, turn
+
+
+# This function decodes the position that starts at the offset of the bytes. It returns the position and the offset
+# after it.
+def decode_position(data, offset = 0):
+    if len(data) < offset + OCCUPIED.size:
+        raise ValueError("truncated position")
+    occupied = OCCUPIED.unpack_from(data, offset)[0]
+    start = offset + OCCUPIED.size
+    end = start + kinds_size(occupied)
+    if len(data) < end:
+        raise ValueError("truncated position")
+    return decode_kinds(occupied, data[start:end]), end
+
+
+# This function reads exactly the given number of bytes from a file. It raises ValueError if the file ends first.
+def read_exactly(file, size):
+    data = file.read(size)
+    if len(data) != size:
+        raise ValueError("truncated file")
+    return data
+
+
+# This function reads a position from a file. It returns None at the end of the file.
+def read_position(file):
+    data = file.read(OCCUPIED.size)
+    if not data:
+        return None
+    if len(data) != OCCUPIED.size:
+        raise ValueError("truncated file")
+    occupied = OCCUPIED.unpack(data)[0]
+    return decode_kinds(occupied, read_exactly(file, kinds_size(occupied)))
+
+
+# This function encodes a move.
+def encode_move(move):
+    source, destination, captured = move
+    if captured:
+        return MOVE.pack(source | CAPTURE_FLAG, destination) + CAPTURED.pack(captured)
+    return MOVE.pack(source, destination)
+
+
+# This function reads a move from a file.
+def read_move(file):
+    source, destination = MOVE.unpack(read_exactly(file, MOVE.size))
+    if source & CAPTURE_FLAG:
+        return source ^ CAPTURE_FLAG, destination, CAPTURED.unpack(read_exactly(file, CAPTURED.size))[0]
+    return source, destination, 0
+
+
+# This function returns a position tuple of a State or Board.
+def get_position(node):
+    x_pieces, o_pieces, kings = node.get_bitboards()
+    return x_pieces, o_pieces, kings, node.get_turn()
+
+
+# This function writes the header of a file.
+def write_header(file, magic):
+    file.write(HEADER.pack(magic, VERSION))
+
+
+# This function reads and checks the header of a file.
+def read_header(file, magic):
+    data = file.read(HEADER.size)
+    if len(data) != HEADER.size:
+        raise ValueError("%s is not a record file" % file.name)
+    file_magic, version = HEADER.unpack(data)
+    if file_magic != magic or version != VERSION:
+        raise ValueError("%s is not a version %d %s file" % (file.name, VERSION, magic.decode()))
+
+
+# This function writes positions to a file, one at a time, and returns their number.
+def write_positions(path, positions):
+    count = 0
+    with open(path, 'wb') as file:
+        write_header(file, POSITIONS_MAGIC)
+        for x_pieces, o_pieces, kings, turn in positions:
+            file.write(encode_position(x_pieces, o_pieces, kings, turn))
+            count += 1
+    return count
+
+
+# This function yields the positions of a file, one at a time.
+def iterate_positions(path):
+    with open(path, 'rb') as file:
+        read_header(file, POSITIONS_MAGIC)
+        while True:
+            position = read_position(file)
+            if position is None:
+                return
+            yield position
+
+
+# This function writes games to a file, one at a time, and returns their number.
+# A game is (start, moves, result): the start position, the list of moves and the result (e.g. X_WIN).
+def write_games(path, games):
+    count = 0
+    with open(path, 'wb') as file:
+        write_header(file, GAMES_MAGIC)
+        for start, moves, result in games:
+            file.write(GAME.pack(result, len(moves)))
+            file.write(encode_position(*start))
+            for move in moves:
+                file.write(encode_move(move))
+            count += 1
+    return count
+
+
+# This function yields the games of a file, one at a time, as (start, moves, result).
+def iterate_games(path):
+    with open(path, 'rb') as file:
+        read_header(file, GAMES_MAGIC)
+        while True:
+            data = file.read(GAME.size)
+            if not data:
+                return
+            if len(data) != GAME.size:
+                raise ValueError("truncated file")
+            result, move_count = GAME.unpack(data)
+            start = read_position(file)
+            if start is None:
+                raise ValueError("truncated file")
+            yield start, [read_move(file) for _ in range(move_count)], result
+
+
+# This function yields the positions of a game, from the start position to the position after the last move.
+def replay_game(start, moves):
+    x_pieces, o_pieces, kings, turn = start
+    yield start
+    for move in moves:
+        x_pieces, o_pieces, kings = bitboard.apply_move(x_pieces, o_pieces, kings, move)
+        turn = not turn
+        yield x_pieces, o_pieces, kings, turn
+
+
+# This function yields every position of every game of a file, e.g. as training data.
+def iterate_game_positions(path):
+    for start, moves, _ in iterate_games(path):
+        yield from replay_game(start, moves)
+
+
+# This function returns the kind of a record file from its magic: 'positions' or 'games'.
+def get_file_kind(path):
+    with open(path, 'rb') as file:
+        magic = file.read(len(POSITIONS_MAGIC))
+    kinds = {POSITIONS_MAGIC: 'positions', GAMES_MAGIC: 'games'}
+    if magic not in kinds:
+        raise ValueError("%s is not a record file" % path)
+    return kinds[magic]
+
+
+# This function parses the command line and prints a summary of record files.
+def main():
+    parser = argparse.ArgumentParser(description = "Prints a summary of position and game record files.")
+    parser.add_argument('paths', nargs = '+')
+    arguments = parser.parse_args()
+
+    for path in arguments.paths:
+        size = os.path.getsize(path)
+        if get_file_kind(path) == 'positions':
+            positions = sum(1 for _ in iterate_positions(path))
+            print("%s: %d positions, %.1f bytes per position" % (path, positions, (size - HEADER.size) /
+                                                                 max(positions, 1)))
+        else:
+            games = 0
+            moves = 0
+            results = [0] * 4
+            for _, game_moves, result in iterate_games(path):
+                games += 1
+                moves += len(game_moves)
+                results[result] += 1
+            print("%s: %d games, %d moves, %d x wins, %d o wins, %d draws, %d unknown" % (
+                path, games, moves, results[X_WIN], results[O_WIN], results[DRAW], results[UNKNOWN]))
+
+
+if __name__ == '__main__':
+    main()
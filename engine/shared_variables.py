@@ -0,0 +1,18 @@
+CACHE_LIMIT = 100000
+HEURISTIC = "HISTORY"
+DEPTH = 5
+TT_SIZE_MB = 16
+SEARCH_MODE = "STATE"
+TIME_LIMIT = 1.0
+WORKERS = 1
+QUIESCENCE = True
+QUIESCENCE_NODES = 256
+TABLEBASE_PATH = "tablebase.bin"
+BOOK_PATH = "book.json"
+PONDER = True
+SERVER_HOST = "127.0.0.1"
+SERVER_PORT = 8765
+SERVER_WORKERS = 2
+SERVER_QUEUE_LIMIT = 32
+SERVER_TIME_LIMIT = 5.0
+SERVER_GAME_LIMIT = 1000
@@ -0,0 +1,182 @@
+from . import bitboard
+from . import zobrist
+
+
+# This class represents a state. The board is stored as three 32-square bitboards (see bitboard.py).
+# The 8x8 table is only built when requested through get_table(). A state does not keep its children, so a search
+# only holds the states along the line it is searching.
+# States are equal if they have the same board and side to move, so they can be used as dictionary keys.
+class State(object):
+    __slots__ = ('x_pieces', 'o_pieces', 'kings', 'key', 'score', 'table', 'moves', 'turn', 'evaluation')
+
+    # This is a constructor. It initializes object variables.
+    # A state can be created from a table or directly from the (x_pieces, o_pieces, kings) bitboards.
+    # The Zobrist key and the board score are computed from scratch unless the parent state passes them in.
+    def __init__(self, table = None, turn = True, bitboards = None, key = None, score = None):
+        if bitboards is None:
+            bitboards = bitboard.table_to_bitboards(table)
+        if key is None:
+            key = zobrist.compute_key(bitboards[0], bitboards[1], bitboards[2], turn)
+        if score is None:
+            score = bitboard.score_board(bitboards[0], bitboards[1], bitboards[2])
+        self.x_pieces, self.o_pieces, self.kings = bitboards
+        self.key = key
+        self.score = score
+        self.table = table
+        self.moves = None
+        self.turn = turn
+        self.evaluation = 0
+
+    # This overloads the equal operator for comparing State objects. The key is compared first, since it differs for
+    # almost all different states.
+    def __eq__(self, other):
+        if not isinstance(other, State):
+            return NotImplemented
+        return (self.key == other.key and self.turn == other.turn and self.x_pieces == other.x_pieces and
+                self.o_pieces == other.o_pieces and self.kings == other.kings)
+
+    # This overloads the hash function for State objects. Equal boards with the same side to move share a hash.
+    def __hash__(self):
+        return self.key
+
+    # This returns whether the game is over, meaning one of the players has no more pieces.
+    def get_game_end(self):
+        return not self.x_pieces or not self.o_pieces
+
+    # This returns the turn boolean flag.
+    def get_turn(self):
+        return self.turn
+
+    # This updates the state evaluation to the given parameter.
+    def set_evaluation(self, value):
+        self.evaluation = value
+
+    # This returns the state evaluation.
+    def get_evaluation(self):
+        return self.evaluation
+
+    # This returns the state's next moves, the states reached by every legal move.
+    def get_next_moves(self):
+        return [self.make_move(move) for move in self.get_moves()]
+
+    # This returns the Zobrist key of the state.
+    def get_key(self):
+        return self.key
+
+    # This returns the board score of the state, from the AI's side and without the game over check.
+    def get_score(self):
+        return self.score
+
+    # This returns the bitboards of the state.
+    def get_bitboards(self):
+        return self.x_pieces, self.o_pieces, self.kings
+
+    # This returns the table. It is built from the bitboards on first use.
+    def get_table(self):
+        if self.table is None:
+            self.table = bitboard.bitboards_to_table(self.x_pieces, self.o_pieces, self.kings)
+        return self.table
+
+    # This counts the pieces of each player on the board.
+    def count_pieces(self):
+        return self.x_pieces.bit_count(), self.o_pieces.bit_count()
+
+    # This function finds the move that was done.
+    def find_move_played(self, previous):
+        # Initialize variables.
+        table = self.get_table()
+        move = []
+
+        # Iterate through the board and append the move done to the list.
+        for i in range(len(table)):
+            for j in range(len(table[i])):
+                if table[i][j] != previous[i][j]:
+                    move.append((i, j))
+
+        # Return move list.
+        return move
+
+    # This function finds capturing moves.
+    def find_capturing_moves(self):
+        jumpers = bitboard.find_jumpers(self.x_pieces, self.o_pieces, self.kings, self.turn)
+        return [bitboard.square_to_coordinates(square) for square in bitboard.squares(jumpers)]
+
+    # This function evaluates the state. Essentially, this is the utility function.
+    # It implements the Control the Center Strategy, where AI will favor center positions (see bitboard.evaluate).
+    # The board score is kept up to date by every move, so the board is not scanned again.
+    def evaluate_state(self):
+        # Get the difference of the two scores. A player without pieces has lost (see bitboard.evaluate).
+        self.evaluation = bitboard.evaluate(self.x_pieces, self.o_pieces, self.score)
+
+        # Return heuristic value.
+        return self.evaluation
+
+    # This returns the legal moves, in the same order as get_next_moves(). Captures are mandatory.
+    def get_moves(self):
+        if self.moves is None:
+            self.moves = bitboard.generate_moves(self.x_pieces, self.o_pieces, self.kings, self.turn)
+        return self.moves
+
+    # This returns a new state reached by the move, with its key and score updated from the move.
+    # States are immutable, so nothing has to be undone.
+    def make_move(self, move):
+        bitboards = bitboard.apply_move(self.x_pieces, self.o_pieces, self.kings, move)
+        key = zobrist.update_key(self.key, self.x_pieces, self.o_pieces, self.kings, move)
+        score = self.score + bitboard.move_delta(self.x_pieces, self.o_pieces, self.kings, move)
+        return State(turn = not self.turn, bitboards = bitboards, key = key, score = score)
+
+    # This does nothing for states. It mirrors Board.unmake_move so both can be searched alike.
+    def unmake_move(self):
+        pass
+
+    # This function generates the bitboards of a new state with the piece to move.
+    # The move is given by its landing square, so a capture sequence is played as a whole. If several capture
+    # sequences land on the square, captured (a list of coordinates, see find_captures_for_field) picks one.
+    def generate_new_state(self, piece, move, captured = None):
+        # Initialize variables.
+        source = bitboard.coordinates_to_square(piece[0], piece[1])
+        destination = bitboard.coordinates_to_square(move[0], move[1])
+        if captured is not None:
+            captured = sum(1 << bitboard.coordinates_to_square(row, column) for row, column in captured)
+
+        # This finds the legal move of the piece that lands on the square. It promotes the piece to king.
+        for legal_move in bitboard.piece_moves(self.x_pieces, self.o_pieces, self.kings, source):
+            if legal_move[1] == destination and (captured is None or legal_move[2] == captured):
+                return bitboard.apply_move(self.x_pieces, self.o_pieces, self.kings, legal_move)
+
+        # The move is not legal.
+        return None
+
+    # This function performs the move.
+    def play_move(self, piece, move, captured = None):
+        # Initialize variables.
+        bitboards = self.generate_new_state(piece, move, captured)
+        position = None
+
+        # Iterate through valid states and find same board within the states.
+        for state in self.get_next_moves():
+            if bitboards == state.get_bitboards():
+                position = state
+                break
+
+        # Return the move.
+        return position
+
+    # This function looks for valid moves. A capture sequence is given by its landing square, and every landing
+    # square is listed once.
+    def find_valid_moves_for_piece(self, coordinates):
+        square = bitboard.coordinates_to_square(coordinates[0], coordinates[1])
+        if square < 0:
+            return []
+        moves = bitboard.piece_moves(self.x_pieces, self.o_pieces, self.kings, square)
+        destinations = dict.fromkeys(destination for _, destination, _ in moves)
+        return [bitboard.square_to_coordinates(destination) for destination in destinations]
+
+    # This function lists the pieces captured by every move of the piece that lands on the field, as lists of
+    # coordinates. A king can reach the same field by capture sequences over different pieces.
+    def find_captures_for_field(self, piece, field):
+        source = bitboard.coordinates_to_square(piece[0], piece[1])
+        destination = bitboard.coordinates_to_square(field[0], field[1])
+        moves = bitboard.piece_moves(self.x_pieces, self.o_pieces, self.kings, source)
+        return [[bitboard.square_to_coordinates(square) for square in bitboard.squares(captured)]
+                for _, landing, captured in moves if landing == destination]
@@ -0,0 +1,115 @@
+import cProfile
+import json
+from time import perf_counter
+
+
+# This module collects statistics of searches. A context (see context.py) reports into its stats collector if it has
+# one; without one, the search only pays a None check per node.
+# Parallel workers (see parallel.py) search without a collector, so only the root of a parallel search is recorded.
+
+# Parts of the search that are timed. Evaluation includes the quiescence search at the horizon.
+TIMERS = ('move_generation', 'ordering', 'evaluation')
+
+
+# This class collects search statistics: nodes and cutoffs per ply, the index of the move that caused every cutoff,
+# transposition table probes and the time spent in every timed part of the search.
+class SearchStats(object):
+    # This is a constructor. It initializes the counters.
+    def __init__(self):
+        self.nodes = []
+        self.cutoffs = []
+        self.cutoff_indexes = {}
+        self.quiescence_nodes = 0
+        self.probes = 0
+        self.probe_hits = 0
+        self.probe_cutoffs = 0
+        self.times = dict.fromkeys(TIMERS, 0.0)
+        self.search_time = 0.0
+
+    # This function counts a node searched at the ply.
+    def record_node(self, ply):
+        while len(self.nodes) <= ply:
+            self.nodes.append(0)
+            self.cutoffs.append(0)
+        self.nodes[ply] += 1
+
+    # This function counts a node of the quiescence search.
+    def record_quiescence_node(self):
+        self.quiescence_nodes += 1
+
+    # This function counts a cutoff at the ply, caused by the move at the index of the ordered moves.
+    def record_cutoff(self, ply, index):
+        self.cutoffs[ply] += 1
+        self.cutoff_indexes[index] = self.cutoff_indexes.get(index, 0) + 1
+
+    # This function counts a transposition table probe, whether it found the position and whether its score was used.
+    def record_probe(self, hit, cutoff):
+        self.probes += 1
+        if hit:
+            self.probe_hits += 1
+        if cutoff:
+            self.probe_cutoffs += 1
+
+    # This function calls the function and adds its run time to the timer.
+    def time(self, timer, function, *arguments):
+        start_time = perf_counter()
+        result = function(*arguments)
+        self.times[timer] += perf_counter() - start_time
+        return result
+
+    # This function generates the moves of the position as a list, timed as move generation.
+    def generate_moves(self, position):
+        start_time = perf_counter()
+        moves = list(position.get_moves())
+        self.times['move_generation'] += perf_counter() - start_time
+        return moves
+
+    # This function adds the run time of a whole search.
+    def record_search(self, seconds):
+        self.search_time += seconds
+
+    # This returns the effective branching factor b: a full tree as deep as the deepest ply searched, with b moves at
+    # every node, has as many nodes as the search.
+    def get_branching_factor(self):
+        depth = len(self.nodes) - 1
+        if depth <= 0:
+            return None
+        return sum(self.nodes) ** (1 / depth)
+
+    # This returns the statistics as a dictionary of JSON values.
+    def to_dict(self):
+        nodes = sum(self.nodes)
+        cutoffs = sum(self.cutoffs)
+        first_move_cutoffs = self.cutoff_indexes.get(0, 0)
+        timed = sum(self.times.values())
+        return {
+            'nodes': nodes,
+            'quiescence_nodes': self.quiescence_nodes,
+            'cutoffs': cutoffs,
+            'plies': [{'ply': ply, 'nodes': self.nodes[ply], 'cutoffs': self.cutoffs[ply],
+                       'branching': self.nodes[ply + 1] / self.nodes[ply] if ply + 1 < len(self.nodes) else None}
+                      for ply in range(len(self.nodes))],
+            'cutoff_move_index': {str(index): count for index, count in sorted(self.cutoff_indexes.items())},
+            'first_move_cutoff_rate': first_move_cutoffs / cutoffs if cutoffs else None,
+            'transposition_probes': self.probes,
+            'transposition_hit_rate': self.probe_hits / self.probes if self.probes else None,
+            'transposition_cutoff_rate': self.probe_cutoffs / self.probes if self.probes else None,
+            'branching_factor': self.get_branching_factor(),
+            'time': {**self.times, 'other': max(self.search_time - timed, 0.0), 'search': self.search_time},
+        }
+
+    # This function writes the statistics to a JSON file.
+    def write_json(self, path):
+        with open(path, 'w') as file:
+            json.dump(self.to_dict(), file, indent = 2)
+            file.write('\n')
+
+
+# This function calls the function under cProfile and writes the profile to the path, in the format of
+# pstats.Stats.dump_stats (readable by pstats, snakeviz and similar tools). It returns the result of the function.
+def profile(path, function, *arguments):
+    profiler = cProfile.Profile()
+    try:
+        return profiler.runcall(function, *arguments)
+    finally:
+        profiler.dump_stats(path)
@@ -0,0 +1,307 @@
+import mmap
+import os
+import struct
+from itertools import combinations
+from math import comb
+from time import time
+
+from . import bitboard
+
+
+# This module builds and probes endgame tablebases: the exact result of every position with few pieces.
+# A material signature (x men, x kings, o men, o kings) has one table per side to move, with one byte per position.
+# A position is indexed by ranking the squares of every piece group among the squares the earlier groups left free.
+# Reference used, https://www.chessprogramming.org/Retrograde_Analysis.
+
+# File layout: the header, one directory entry per signature, then the tables.
+MAGIC = b'CKTB'
+VERSION = 1
+HEADER = struct.Struct('<4sHHI')
+ENTRY = struct.Struct('<BBBBQI')
+
+# Position values, from the side to move. A win or loss stores its distance in plies to the end of the game.
+DRAW = 0
+LOSS = 128
+MAX_DISTANCE = 127
+
+# Binomial coefficients for ranking squares, indexed by [n][k].
+BINOMIAL = [[comb(n, k) for k in range(33)] for n in range(33)]
+
+
+# This function returns the material signature of a board.
+def get_signature(x_pieces, o_pieces, kings):
+    x_kings = x_pieces & kings
+    o_kings = o_pieces & kings
+    return ((x_pieces ^ x_kings).bit_count(), x_kings.bit_count(), (o_pieces ^ o_kings).bit_count(),
+            o_kings.bit_count())
+
+
+# This function lists the signatures with up to the given number of pieces, where both sides have a piece.
+# A signature only depends on signatures with fewer pieces (captures) or fewer men (promotions), so every signature
+# comes after the ones it depends on.
+def list_signatures(pieces):
+    signatures = []
+    for total in range(2, pieces + 1):
+        for men in range(total + 1):
+            for x_men in range(men + 1):
+                for x_kings in range(total - men + 1):
+                    signature = (x_men, x_kings, men - x_men, total - men - x_kings)
+                    if signature[0] + signature[1] and signature[2] + signature[3]:
+                        signatures.append(signature)
+    return signatures
+
+
+# This function returns the signatures a move can lead to from a signature, where both sides keep a piece: the side to
+# move promotes at most one man and captures any of the other side's pieces.
+def list_dependencies(signature):
+    dependencies = set()
+    for side, other in ((0, 2), (2, 0)):
+        for promoted in range(min(signature[side], 1) + 1):
+            for captured_men in range(signature[other] + 1):
+                for captured_kings in range(signature[other + 1] + 1):
+                    child = list(signature)
+                    child[side] -= promoted
+                    child[side + 1] += promoted
+                    child[other] -= captured_men
+                    child[other + 1] -= captured_kings
+                    child = tuple(child)
+                    if child != signature and child[0] + child[1] and child[2] + child[3]:
+                        dependencies.add(child)
+    return dependencies
+
+
+# This function returns the number of positions of a signature for one side to move.
+def signature_size(signature):
+    size = 1
+    free = 32
+    for count in signature:
+        size *= BINOMIAL[free][count]
+        free -= count
+    return size
+
+
+# This function returns the index of a board within the table of its signature.
+def encode(signature, x_pieces, o_pieces, kings):
+    # Initialize variables.
+    index = 0
+    used = 0
+    groups = (x_pieces & ~kings, x_pieces & kings, o_pieces & ~kings, o_pieces & kings)
+
+    # Rank every group among the squares left free by the earlier groups, as a combinatorial number.
+    for group, count in zip(groups, signature):
+        free = 32 - used.bit_count()
+        rank = 0
+        for position, square in enumerate(bitboard.squares(group)):
+            rank += BINOMIAL[square - (used & ((1 << square) - 1)).bit_count()][position + 1]
+        index = index * BINOMIAL[free][count] + rank
+        used |= group
+
+    # Return index.
+    return index
+
+
+# This function yields every board of a signature. Boards where a man stands on its crown row are left out,
+# since the man would have been promoted.
+def iterate_boards(signature):
+    x_men, x_kings, o_men, o_kings = signature
+    for x_man_squares in combinations(range(32), x_men):
+        x_man_board = sum(1 << square for square in x_man_squares)
+        if x_man_board & bitboard.TOP_ROW:
+            continue
+        for x_king_squares in combinations([s for s in range(32) if not x_man_board >> s & 1], x_kings):
+            x_pieces = x_man_board | sum(1 << square for square in x_king_squares)
+            for o_man_squares in combinations([s for s in range(32) if not x_pieces >> s & 1], o_men):
+                o_man_board = sum(1 << square for square in o_man_squares)
+                if o_man_board & bitboard.BOTTOM_ROW:
+                    continue
+                occupied = x_pieces | o_man_board
+                for o_king_squares in combinations([s for s in range(32) if not occupied >> s & 1], o_kings):
+                    o_king_board = sum(1 << square for square in o_king_squares)
+                    yield x_pieces, o_man_board | o_king_board, (x_pieces ^ x_man_board) | o_king_board
+
+
+# This function returns the value of a board from the side to move, looked up in solved tables.
+def lookup(tables, x_pieces, o_pieces, kings, turn):
+    # A side without pieces has lost.
+    if not x_pieces or not o_pieces:
+        return LOSS
+    signature = get_signature(x_pieces, o_pieces, kings)
+    table = tables[signature]
+    return table[int(turn) * signature_size(signature) + encode(signature, x_pieces, o_pieces, kings)]
+
+
+# This function solves every position of a signature by retrograde analysis and returns its tables.
+# Moves to other signatures (captures and promotions) are looked up in the solved tables.
+# Positions are then settled backwards from the decided ones, by increasing distance, so every distance is the
+# shortest win or the longest loss. Positions that are never settled are draws.
+def solve_signature(signature, tables):
+    # Initialize variables.
+    size = signature_size(signature)
+    values = bytearray(2 * size)
+    settled = bytearray(2 * size)
+    predecessors = [[] for _ in range(2 * size)]
+    unsettled_children = [0] * (2 * size)
+    longest_loss = [0] * (2 * size)
+    safe = bytearray(2 * size)
+    buckets = [[] for _ in range(MAX_DISTANCE + 2)]
+
+    # Generate the moves of every position. Collect the moves that stay within the signature backwards.
+    for x_pieces, o_pieces, kings in iterate_boards(signature):
+        index = encode(signature, x_pieces, o_pieces, kings)
+        for turn in (False, True):
+            node = int(turn) * size + index
+            shortest_win = None
+            for move in bitboard.iterate_moves(x_pieces, o_pieces, kings, turn):
+                child = bitboard.apply_move(x_pieces, o_pieces, kings, move)
+                if child[0] and child[1] and get_signature(*child) == signature:
+                    predecessors[int(not turn) * size + encode(signature, *child)].append(node)
+                    unsettled_children[node] += 1
+                    continue
+                value = lookup(tables, *child, not turn)
+                if value == DRAW:
+                    safe[node] = 1
+                elif value >= LOSS:
+                    safe[node] = 1
+                    distance = min(value - LOSS + 1, MAX_DISTANCE)
+                    if shortest_win is None or distance < shortest_win:
+                        shortest_win = distance
+                else:
+                    longest_loss[node] = max(longest_loss[node], min(value + 1, MAX_DISTANCE))
+
+            # Queue what is already known. A position with a move to a draw or win (safe) cannot be lost.
+            # A win through another signature may still be beaten by a shorter one.
+            if shortest_win is not None:
+                buckets[shortest_win].append((node, shortest_win))
+            elif not unsettled_children[node] and not safe[node]:
+                buckets[longest_loss[node]].append((node, LOSS + longest_loss[node]))
+
+    # Settle the positions by increasing distance.
+    for distance in range(MAX_DISTANCE + 1):
+        for node, value in buckets[distance]:
+            if settled[node]:
+                continue
+            settled[node] = 1
+            values[node] = value
+
+            # A loss makes every predecessor a win. A win counts down the moves its predecessors have left.
+            for predecessor in predecessors[node]:
+                if settled[predecessor]:
+                    continue
+                if value >= LOSS:
+                    buckets[min(distance + 1, MAX_DISTANCE)].append((predecessor, min(distance + 1, MAX_DISTANCE)))
+                else:
+                    unsettled_children[predecessor] -= 1
+                    longest_loss[predecessor] = max(longest_loss[predecessor], min(distance + 1, MAX_DISTANCE))
+                    if not unsettled_children[predecessor] and not safe[predecessor]:
+                        loss = longest_loss[predecessor]
+                        buckets[loss].append((predecessor, LOSS + loss))
+
+    # Return the tables.
+    return values
+
+
+# This function solves a signature in a worker process and returns it with its tables.
+def solve_task(signature, tables):
+    return signature, bytes(solve_signature(signature, tables))
+
+
+# This function builds the tablebase of all positions with up to the given number of pieces and writes it to a file.
+# Signatures with the same number of pieces and men do not depend on each other, so they are solved in parallel.
+# Every task is only sent the tables of the signatures it depends on.
+def build(pieces, path, workers = None):
+    # Initialize variables. The process pool is imported here, so probing the tablebase does not load it.
+    from concurrent.futures import ProcessPoolExecutor
+    tables = {}
+    levels = {}
+    for signature in list_signatures(pieces):
+        levels.setdefault((sum(signature), signature[0] + signature[2]), []).append(signature)
+
+    # Solve the signatures level by level.
+    with ProcessPoolExecutor(max_workers = workers) as pool:
+        for level in sorted(levels):
+            futures = [pool.submit(solve_task, signature, {dependency: tables[dependency]
+                                                           for dependency in list_dependencies(signature)})
+                       for signature in levels[level]]
+            for future in futures:
+                signature, values = future.result()
+                tables[signature] = values
+
+    # Write the header, the directory and the tables.
+    offset = HEADER.size + ENTRY.size * len(tables)
+    with open(path, 'wb') as file:
+        file.write(HEADER.pack(MAGIC, VERSION, pieces, len(tables)))
+        for signature, values in tables.items():
+            file.write(ENTRY.pack(*signature, offset, len(values) // 2))
+            offset += len(values)
+        for values in tables.values():
+            file.write(values)
+
+    # Return the tables.
+    return tables
+
+
+# This class represents a tablebase file. The file is mapped into memory and probed in place, without reading it.
+class Tablebase(object):
+    # This is a constructor. It maps the file and reads its directory. The path is kept absolute, so it names the same
+    # file from any working directory.
+    def __init__(self, path):
+        self.path = os.path.abspath(path)
+        with open(path, 'rb') as file:
+            self.data = mmap.mmap(file.fileno(), 0, access = mmap.ACCESS_READ)
+        magic, version, self.pieces, count = HEADER.unpack_from(self.data, 0)
+        if magic != MAGIC or version != VERSION:
+            raise ValueError("%s is not a version %d tablebase" % (path, VERSION))
+        self.directory = {}
+        for number in range(count):
+            entry = ENTRY.unpack_from(self.data, HEADER.size + number * ENTRY.size)
+            self.directory[entry[:4]] = entry[4:]
+
+    # This returns the absolute path of the file.
+    def get_path(self):
+        return self.path
+
+    # This returns the largest number of pieces covered by the tablebase.
+    def get_pieces(self):
+        return self.pieces
+
+    # This function returns the value of a board from the side to move, or None if the board is not covered.
+    def probe(self, x_pieces, o_pieces, kings, turn):
+        signature = get_signature(x_pieces, o_pieces, kings)
+        entry = self.directory.get(signature)
+        if entry is None:
+            return None
+        offset, size = entry
+        return self.data[offset + (size if turn else 0) + encode(signature, x_pieces, o_pieces, kings)]
+
+    # This closes the file mapping.
+    def close(self):
+        self.data.close()
+
+
+# This function opens a tablebase file. It returns None if there is no such file.
+def load(path):
+    try:
+        return Tablebase(path)
+    except FileNotFoundError:
+        return None
+
+
+# This function parses the command line and builds a tablebase.
+def main():
+    import argparse
+    parser = argparse.ArgumentParser(description = "Builds an endgame tablebase by retrograde analysis.")
+    parser.add_argument('--pieces', type = int, default = 3, help = "largest number of pieces on the board")
+    parser.add_argument('--output', default = 'tablebase.bin')
+    parser.add_argument('--workers', type = int, default = None, help = "worker processes (default: all cores)")
+    arguments = parser.parse_args()
+
+    start_time = time()
+    tables = build(arguments.pieces, arguments.output, arguments.workers)
+    positions = sum(len(values) for values in tables.values())
+    wins = sum(1 for values in tables.values() for value in values if DRAW < value < LOSS)
+    print("Signatures: %d, positions: %d, wins: %d, time: %.1f s" % (len(tables), positions, wins,
+                                                                     time() - start_time))
+
+
+if __name__ == '__main__':
+    main()
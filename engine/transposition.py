@@ -0,0 +1,103 @@
+# This module implements a bounded transposition table keyed by Zobrist keys (see zobrist.py).
+# Reference used, https://www.chessprogramming.org/Transposition_Table.
+
+
+# Bound types of a stored score.
+EXACT = 0
+LOWER = 1
+UPPER = 2
+
+# Approximate memory used by one stored entry (tuple, key, score and list slot), in bytes.
+ENTRY_SIZE = 168
+
+
+# This class represents the transposition table. Every bucket has two slots.
+# The first slot keeps the deepest search of the bucket, the second slot is always replaced.
+# Every entry records the search (generation) that stored it. A table lives for a whole game, or longer in a server
+# worker, so entries of older searches give way to new ones whatever their depth, instead of filling the first slots
+# with positions that can no longer occur.
+class TranspositionTable(object):
+    # This is a constructor. It sizes the table to the given limit in megabytes.
+    def __init__(self, size_mb = 16):
+        self.buckets = max(1, size_mb * 1024 * 1024 // (2 * ENTRY_SIZE))
+        self.depth_preferred = [None] * self.buckets
+        self.always_replace = [None] * self.buckets
+        self.generation = 0
+        self.entries = 0
+        self.probes = 0
+        self.hits = 0
+
+    # This empties the table and resets its counters.
+    def clear(self):
+        self.depth_preferred = [None] * self.buckets
+        self.always_replace = [None] * self.buckets
+        self.entries = 0
+        self.probes = 0
+        self.hits = 0
+
+    # This starts a new search. Entries stored before it can be replaced by any new entry.
+    def new_search(self):
+        self.generation += 1
+
+    # This function looks for a key. It returns a (key, depth, bound, score, best_move, generation) tuple or None.
+    # The best move is a move code (see bitboard.encode_move) or None.
+    def probe(self, key):
+        # Initialize variables.
+        index = key % self.buckets
+        self.probes += 1
+
+        # Check both slots of the bucket.
+        for entry in (self.depth_preferred[index], self.always_replace[index]):
+            if entry is not None and entry[0] == key:
+                self.hits += 1
+                return entry
+
+        # Key was not found.
+        return None
+
+    # This function stores a search result.
+    def store(self, key, depth, bound, score, best_move):
+        # Initialize variables.
+        index = key % self.buckets
+        entry = (key, depth, bound, score, best_move, self.generation)
+        current = self.depth_preferred[index]
+
+        # Keep the deeper search of the current search in the first slot. Move the replaced entry to the second slot.
+        if current is None or current[0] == key or current[5] != self.generation or depth >= current[1]:
+            if current is None:
+                self.entries += 1
+            elif current[0] != key:
+                self.store_always_replace(index, current)
+            self.depth_preferred[index] = entry
+
+        # Otherwise, store it in the second slot.
+        else:
+            self.store_always_replace(index, entry)
+
+    # This function records a best move without a score, e.g. for a principal variation found elsewhere.
+    # An existing entry keeps its score. A new entry gets depth -1, so it is only used for move ordering.
+    def store_move(self, key, best_move):
+        # Initialize variable.
+        index = key % self.buckets
+
+        # Update the best move of an existing entry.
+        for slots in (self.depth_preferred, self.always_replace):
+            entry = slots[index]
+            if entry is not None and entry[0] == key:
+                slots[index] = entry[:4] + (best_move, self.generation)
+                return
+
+        # Otherwise, store a new entry.
+        self.store(key, -1, EXACT, 0, best_move)
+
+    # This function overwrites the second slot of a bucket.
+    def store_always_replace(self, index, entry):
+        if self.always_replace[index] is None:
+            self.entries += 1
+        self.always_replace[index] = entry
+
+    # This returns the ratio of probes that found their key.
+    def get_hit_rate(self):
+        if self.probes == 0:
+            return 0.0
+        return self.hits / self.probes
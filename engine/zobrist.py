@@ -0,0 +1,96 @@
+import os
+import struct
+
+from . import bitboard
+
+
+# This seed keeps keys identical between runs, so stored keys (e.g. on disk) stay valid.
+SEED = 20240229
+
+# File the keys are cached in. Generating them needs the random module, which takes longer to import than the rest
+# of the engine, so they are generated once and read from this file by later runs.
+CACHE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), '__pycache__', 'zobrist-%d.bin' % SEED)
+KEYS = struct.Struct('<129Q')
+
+
+# This function generates the keys from the seed: 32 keys for each of the 4 piece kinds, then the side to move key.
+def generate_keys():
+    # The random module is imported here, since it is only needed without a cache.
+    from random import Random
+    random = Random(SEED)
+    return [random.getrandbits(64) for _ in range(KEYS.size // 8)]
+
+
+# This function returns the keys, read from the cache file. If the file is missing or broken, the keys are generated
+# and the file is written. The file is replaced in one step, so processes starting at the same time never read half
+# a file.
+def load_keys():
+    # Read the cache.
+    try:
+        with open(CACHE_PATH, 'rb') as file:
+            return list(KEYS.unpack(file.read()))
+    except (OSError, struct.error):
+        pass
+
+    # Generate the keys and write the cache. A cache that cannot be written is skipped.
+    keys = generate_keys()
+    temporary_path = '%s.%d' % (CACHE_PATH, os.getpid())
+    try:
+        os.makedirs(os.path.dirname(CACHE_PATH), exist_ok = True)
+        with open(temporary_path, 'wb') as file:
+            file.write(KEYS.pack(*keys))
+        os.replace(temporary_path, CACHE_PATH)
+    except OSError:
+        pass
+
+    # Return keys.
+    return keys
+
+
+# Create the key table, indexed by [kind][square] (kinds are defined in bitboard.py), and the side to move key.
+_keys = load_keys()
+PIECE_KEYS = [_keys[kind * 32:(kind + 1) * 32] for kind in range(4)]
+TURN_KEY = _keys[128]
+
+
+# This function computes the key of a board from scratch.
+def compute_key(x_pieces, o_pieces, kings, turn):
+    # Initialize variable.
+    key = TURN_KEY if turn else 0
+
+    # Add the key of every piece on the board.
+    for kind, pieces in ((bitboard.X_MAN, x_pieces & ~kings), (bitboard.X_KING, x_pieces & kings),
+                         (bitboard.O_MAN, o_pieces & ~kings), (bitboard.O_KING, o_pieces & kings)):
+        for square in bitboard.squares(pieces):
+            key ^= PIECE_KEYS[kind][square]
+
+    # Return key.
+    return key
+
+
+# This function updates a key with a move played on the given board. It returns the key of the new board.
+def update_key(key, x_pieces, o_pieces, kings, move):
+    # Initialize variables.
+    source, destination, captured = move
+    source_bit = 1 << source
+
+    # Find the kinds of the moving piece and of the captured pieces.
+    if x_pieces & source_bit:
+        man, king, opponent_man, opponent_king = bitboard.X_MAN, bitboard.X_KING, bitboard.O_MAN, bitboard.O_KING
+        promoted = (1 << destination) & bitboard.TOP_ROW
+    else:
+        man, king, opponent_man, opponent_king = bitboard.O_MAN, bitboard.O_KING, bitboard.X_MAN, bitboard.X_KING
+        promoted = (1 << destination) & bitboard.BOTTOM_ROW
+
+    # Move the piece. It becomes a king if promoted.
+    if kings & source_bit:
+        key ^= PIECE_KEYS[king][source] ^ PIECE_KEYS[king][destination]
+    else:
+        key ^= PIECE_KEYS[man][source] ^ PIECE_KEYS[king if promoted else man][destination]
+
+    # Remove the captured pieces.
+    for square in bitboard.squares(captured):
+        key ^= PIECE_KEYS[opponent_king if kings & (1 << square) else opponent_man][square]
+
+    # Flip the side to move.
+    return key ^ TURN_KEY
@@ -65,6 +65,23 @@ def choose_field(valid_moves):
             print("Invalid coordinates! Try again.")
 
 
+# This function prompts the player to choose between capture sequences that land on the same field.
+# Every choice is a list of the coordinates of the captured pieces. It returns the chosen list.
+def choose_capture(captures):
+    for number, captured in enumerate(captures, 1):
+        print(str(number) + ": capture " + ", ".join(str(row) + chr(column + 65) for row, column in captured))
+    while True:
+        raw = input("Enter the number of the capture: ")
+        try:
+            number = int(raw)
+            if not 1 <= number <= len(captures):
+                print("Selection is not valid! Try again.")
+            else:
+                return captures[number - 1]
+        except:
+            print("Invalid number! Try again.")
+
+
 # This function prints the table. It accepts two additional parameters, selected and valid_moves.
 # If additional parameters are supplied, it will print the table with prompts for valid_moves or selected piece.
 def print_table(table, selected = None, valid_moves = None):
@@ -0,0 +1,143 @@
+import argparse
+from time import time
+
+from engine import bitboard
+from engine.board import Board
+from benchmark import POSITIONS, load_position
+
+
+# Published leaf counts of the start position of English draughts, by depth. A jump sequence counts as one move.
+REFERENCE_COUNTS = {
+    'start': {1: 7, 2: 49, 3: 302, 4: 1469, 5: 7361, 6: 36768, 7: 179740, 8: 845931, 9: 3963680, 10: 18391564},
+}
+
+
+# This function counts the leaves of the move tree through State objects, as the search sees them.
+def perft_state(state, depth):
+    if depth == 0:
+        return 1
+    if depth == 1:
+        return len(state.get_next_moves())
+    return sum(perft_state(child, depth - 1) for child in state.get_next_moves())
+
+
+# This function counts the leaves of the move tree by making and unmaking moves on a Board.
+def perft_board(state, depth):
+    # This counts the leaves below the board.
+    def count(board, depth):
+        if depth == 1:
+            return sum(1 for _ in board.get_moves())
+        nodes = 0
+        for move in board.get_moves():
+            nodes += count(board.make_move(move), depth - 1)
+            board.unmake_move()
+        return nodes
+
+    if depth == 0:
+        return 1
+    return count(Board(*state.get_bitboards(), state.get_turn(), state.get_key()), depth)
+
+
+# This function counts the leaves of the move tree on the bare bitboards, without keys or scores.
+def perft_bitboard(state, depth):
+    # This counts the leaves below the bitboards.
+    def count(x_pieces, o_pieces, kings, turn, depth):
+        if depth == 1:
+            return len(bitboard.generate_moves(x_pieces, o_pieces, kings, turn))
+        nodes = 0
+        for move in bitboard.iterate_moves(x_pieces, o_pieces, kings, turn):
+            nodes += count(*bitboard.apply_move(x_pieces, o_pieces, kings, move), not turn, depth - 1)
+        return nodes
+
+    if depth == 0:
+        return 1
+    return count(*state.get_bitboards(), state.get_turn(), depth)
+
+
+# Available move generation backends. A new move generator gets an entry here and is checked against the others.
+BACKENDS = {
+    'state': perft_state,
+    'board': perft_board,
+    'bitboard': perft_bitboard,
+}
+
+
+# This function formats a move with table coordinates.
+def format_move(move):
+    source, destination, captured = move
+    text = "%s-%s" % (bitboard.square_to_coordinates(source), bitboard.square_to_coordinates(destination))
+    if captured:
+        text += " x" + ",".join(str(square) for square in bitboard.squares(captured))
+    return text
+
+
+# This function counts the leaves below every root move of the position.
+# It returns a list of (move, leaves) pairs, in generation order.
+def divide(state, depth, backend):
+    function = BACKENDS[backend]
+    return [(move, function(state.make_move(move), depth - 1)) for move in state.get_moves()]
+
+
+# This function runs perft on a position with every backend, from depth 1 to the given depth.
+# Counts are checked against the reference counts, if any, and against each other.
+# It returns True if all counts agree.
+def run_perft(name, depth, backends, show_divide = False):
+    # Initialize variables.
+    reference = REFERENCE_COUNTS.get(name, {})
+    passed = True
+
+    # Count every depth with every backend.
+    print("Position: " + name)
+    print("Depth  Backend    Leaves       Time (s)  Leaves/s     Result")
+    for current_depth in range(1, depth + 1):
+        counts = set()
+        for backend in backends:
+            state = load_position(name)
+            start_time = time()
+            leaves = BACKENDS[backend](state, current_depth)
+            time_elapsed = time() - start_time
+            counts.add(leaves)
+
+            # Compare the count with the reference and with the other backends.
+            if current_depth in reference and leaves != reference[current_depth]:
+                result = "MISMATCH (expected %d)" % reference[current_depth]
+            elif len(counts) > 1:
+                result = "BACKEND MISMATCH"
+            else:
+                result = "ok"
+            passed = passed and result == "ok"
+            rate = leaves / time_elapsed if time_elapsed else 0
+            print("%-6d %-10s %-12d %-9.3f %-12d %s" % (current_depth, backend, leaves, time_elapsed, rate, result))
+
+    # Print the leaves below every root move.
+    if show_divide:
+        print("Divide at depth %d (%s):" % (depth, backends[0]))
+        total = 0
+        for move, leaves in divide(load_position(name), depth, backends[0]):
+            print("%-28s %d" % (format_move(move), leaves))
+            total += leaves
+        print("%-28s %d" % ("total", total))
+
+    # Return the overall result.
+    return passed
+
+
+# This function parses the command line and runs perft.
+def main():
+    parser = argparse.ArgumentParser(description = "Counts the leaves of the move tree to check and time move "
+                                                   "generation.")
+    parser.add_argument('--depth', type = int, default = 6)
+    parser.add_argument('--positions', nargs = '+', default = ['start'], choices = list(POSITIONS))
+    parser.add_argument('--backends', nargs = '+', default = list(BACKENDS), choices = list(BACKENDS))
+    parser.add_argument('--divide', action = 'store_true', help = "print the leaves below every root move")
+    arguments = parser.parse_args()
+
+    passed = True
+    for name in arguments.positions:
+        passed = run_perft(name, arguments.depth, arguments.backends, arguments.divide) and passed
+    if not passed:
+        exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,388 @@
+import argparse
+import asyncio
+import json
+import signal
+from concurrent.futures import ProcessPoolExecutor
+from itertools import count
+from math import inf, isfinite
+from time import time
+
+from engine import ai, book, parallel, shared_variables
+from engine.bitboard import START_O_PIECES, START_X_PIECES, bitboards_to_table, table_to_bitboards
+from engine.context import SearchContext
+from engine.state import State
+
+
+# This module implements the engine server: one process that plays many games at the same time.
+# Clients talk to it over a local TCP socket with JSON lines: every request is one JSON object on one line, and the
+# server answers every request with one JSON object on one line, in order. A request has a "command" and may have an
+# "id", which is copied into the response. A response has "ok", and an "error" text if the request failed.
+#
+# Commands:
+#   new-game      Starts a game and returns it. Takes an optional "board" (8 rows of '-', 'x', 'o', 'X', 'O') and
+#                 "turn" ('x' or 'o'). By default the game starts from the initial board with x to move.
+#   make-move     Plays "move" in "game" and returns the game.
+#   get-ai-move   Searches "game" for the side to move and returns the "move", "evaluation" and "variation".
+#                 The move is played unless "play" is false. "time_limit" (seconds) bounds the whole request,
+#                 including the time it waits for a worker; the first iteration of the search always completes.
+#                 "depth" bounds the search depth.
+#   close-game    Ends "game" and frees it.
+#
+# A game is returned as its "game" id, "board", "turn", legal "moves" and "winner" (null while it is running).
+# Moves are [source, destination, captured] lists of squares, as in engine/bitboard.py.
+#
+# Searches run in a bounded process pool. Requests that wait for a worker are queued, and a search request is
+# rejected with a "busy" error when the queue is full, so clients can back off instead of piling up.
+
+
+# This exception fails a request. Its text is sent to the client.
+class RequestError(Exception):
+    pass
+
+
+# This function converts a score to a JSON value. Infinite scores (decided games) become strings.
+def json_score(score):
+    return str(score) if score in (inf, -inf) else score
+
+
+# This returns whether a JSON value is an integer. JSON true and false are read as bools, which are ints in Python.
+def is_integer(value):
+    return isinstance(value, int) and not isinstance(value, bool)
+
+
+# This function runs in every new worker process. Workers ignore interrupts, so Ctrl-C only stops the server, which
+# then shuts the pool down.
+def initialize_worker():
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+
+
+# This function searches a position for the side to move. It runs in a worker process, with the context of the
+# worker (see parallel.get_worker_context), so a worker keeps its tables between requests of every game.
+# It returns the evaluation, the best move, the principal variation, the completed depth and the node count.
+def search_position(config, bitboards, turn, key, score, time_limit, depth):
+    # Reset the counters of the context.
+    context = parallel.get_worker_context(config)
+    context.reset_counters()
+    context.new_search()
+    context.age_history()
+
+    # Search the position.
+    position = State(turn = turn, bitboards = bitboards, key = key, score = score)
+    evaluation, best_move, variation, completed_depth = ai.iterative_deepening(context, position, time_limit,
+                                                                              not turn, depth)
+
+    # Return the result.
+    return evaluation, best_move, variation, completed_depth, context.nodes
+
+
+# This class represents a game of the server.
+class Game(object):
+    # This is a constructor. It initializes object variables.
+    def __init__(self, game_id, position):
+        self.game_id = game_id
+        self.position = position
+        self.lock = asyncio.Lock()
+
+    # This returns the game id.
+    def get_game_id(self):
+        return self.game_id
+
+    # This returns the current position.
+    def get_position(self):
+        return self.position
+
+    # This function plays a move. Only the new position is kept.
+    def play(self, move):
+        self.position = self.position.make_move(move)
+
+    # This function returns the game as a JSON object.
+    def describe(self):
+        position = self.position
+        moves = position.get_moves()
+        winner = None
+        if not moves:
+            winner = 'o' if position.get_turn() else 'x'
+        return {
+            'game': self.game_id,
+            'board': [''.join(row) for row in bitboards_to_table(*position.get_bitboards())],
+            'turn': 'x' if position.get_turn() else 'o',
+            'moves': [list(move) for move in moves],
+            'winner': winner,
+        }
+
+
+# This class is the engine server. It keeps the games and the worker pool, and answers the requests of every client.
+class EngineServer(object):
+    # This is a constructor. It initializes the limits, games and counters. The pool is created by start().
+    # The tablebase is given as to SearchContext.
+    def __init__(self, workers = None, queue_limit = None, max_time_limit = None, game_limit = None, tablebase = True):
+        # Limits.
+        self.workers = workers or shared_variables.SERVER_WORKERS
+        self.queue_limit = queue_limit or shared_variables.SERVER_QUEUE_LIMIT
+        self.max_time_limit = max_time_limit or shared_variables.SERVER_TIME_LIMIT
+        self.game_limit = game_limit or shared_variables.SERVER_GAME_LIMIT
+
+        # Searches run with the default configuration, one worker each, since the pool already runs them side by side.
+        self.config = SearchContext(workers = 1, tablebase = tablebase).get_config()
+        self.opening_book = book.load(shared_variables.BOOK_PATH)
+        self.pool = None
+        self.server = None
+        self.slots = None
+        self.pending = 0
+        self.connections = set()
+
+        # Games.
+        self.games = {}
+        self.game_ids = count(1)
+
+        # Counters.
+        self.requests = 0
+        self.errors = 0
+        self.rejected = 0
+        self.searches = 0
+        self.book_hits = 0
+
+    # This function starts the worker pool and listens on the address. It returns the bound (host, port), so port 0
+    # picks a free port.
+    async def start(self, host = None, port = None):
+        self.pool = ProcessPoolExecutor(max_workers = self.workers, initializer = initialize_worker)
+        self.slots = asyncio.Semaphore(self.workers)
+        self.server = await asyncio.start_server(self.handle_connection, host or shared_variables.SERVER_HOST,
+                                                 shared_variables.SERVER_PORT if port is None else port)
+        return self.server.sockets[0].getsockname()[:2]
+
+    # This function stops listening, ends the open connections and shuts the worker pool down.
+    async def close(self):
+        if self.server is not None:
+            self.server.close()
+            await self.server.wait_closed()
+            self.server = None
+        for task in self.connections:
+            task.cancel()
+        await asyncio.gather(*self.connections, return_exceptions = True)
+        if self.pool is not None:
+            self.pool.shutdown(cancel_futures = True)
+            self.pool = None
+
+    # This function serves until the task is cancelled.
+    async def serve_forever(self):
+        await self.server.serve_forever()
+
+    # This returns the counters of the server.
+    def get_stats(self):
+        return {
+            'games': len(self.games),
+            'requests': self.requests,
+            'errors': self.errors,
+            'rejected': self.rejected,
+            'searches': self.searches,
+            'book_hits': self.book_hits,
+            'pending': self.pending,
+        }
+
+    # This function answers the requests of one client, one line at a time. The next request is only read once the
+    # answer is sent, so a client that does not read its answers is slowed down by the socket buffers.
+    async def handle_connection(self, reader, writer):
+        task = asyncio.current_task()
+        self.connections.add(task)
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                response = await self.handle_line(line)
+                writer.write(json.dumps(response).encode() + b'\n')
+                await writer.drain()
+        except (ConnectionError, ValueError):
+            # The client went away or sent a line longer than the stream limit.
+            pass
+        except asyncio.CancelledError:
+            # The server is closing.
+            pass
+        finally:
+            self.connections.discard(task)
+            writer.close()
+
+    # This function answers one request line.
+    async def handle_line(self, line):
+        # Initialize variables.
+        self.requests += 1
+        request_id = None
+
+        # Parse the request and run its command.
+        try:
+            try:
+                request = json.loads(line)
+            except ValueError:
+                raise RequestError("request is not valid JSON")
+            if not isinstance(request, dict):
+                raise RequestError("request is not a JSON object")
+            request_id = request.get('id')
+            name = request.get('command')
+            if not isinstance(name, str) or name not in self.COMMANDS:
+                raise RequestError("unknown command %r" % (name,))
+            response = await self.COMMANDS[name](self, request)
+            response['ok'] = True
+        except RequestError as error:
+            self.errors += 1
+            response = {'ok': False, 'error': str(error)}
+        except Exception as error:
+            # Any other failure only fails the request, so the connection keeps serving the client.
+            self.errors += 1
+            response = {'ok': False, 'error': "internal error: %r" % (error,)}
+
+        # Return the response.
+        if request_id is not None:
+            response['id'] = request_id
+        return response
+
+    # This function returns the game of a request.
+    def find_game(self, request):
+        game_id = request.get('game')
+        if not is_integer(game_id) or game_id not in self.games:
+            raise RequestError("unknown game %r" % (game_id,))
+        return self.games[game_id]
+
+    # This function starts a game.
+    async def new_game(self, request):
+        # Check the limit of games.
+        if len(self.games) >= self.game_limit:
+            raise RequestError("too many games")
+
+        # Read the board and the side to move.
+        rows = request.get('board')
+        turn = request.get('turn', 'x')
+        if turn not in ('x', 'o'):
+            raise RequestError("turn must be 'x' or 'o'")
+        if rows is None:
+            bitboards = (START_X_PIECES, START_O_PIECES, 0)
+        else:
+            if (not isinstance(rows, list) or len(rows) != 8 or
+                    any(not isinstance(row, str) or len(row) != 8 or set(row) - set('-xoXO') for row in rows)):
+                raise RequestError("board must be 8 rows of 8 characters out of '-xoXO'")
+            bitboards = table_to_bitboards([list(row) for row in rows])
+
+        # Create the game.
+        game = Game(next(self.game_ids), State(turn = turn == 'x', bitboards = bitboards))
+        self.games[game.get_game_id()] = game
+        return game.describe()
+
+    # This function plays a move of a client.
+    async def make_move(self, request):
+        game = self.find_game(request)
+        async with game.lock:
+            move = request.get('move')
+            if (not isinstance(move, list) or len(move) != 3 or not all(is_integer(square) for square in move) or
+                    tuple(move) not in game.get_position().get_moves()):
+                raise RequestError("move %r is not legal" % (move,))
+            game.play(tuple(move))
+            return game.describe()
+
+    # This function searches a game for the side to move and plays the best move.
+    # A book move is played at once. Otherwise the request waits for a free worker, unless the queue is full.
+    async def get_ai_move(self, request):
+        # Initialize variables.
+        start_time = time()
+        game = self.find_game(request)
+        time_limit = request.get('time_limit', shared_variables.TIME_LIMIT)
+        depth = request.get('depth', 64)
+        if (not isinstance(time_limit, (int, float)) or isinstance(time_limit, bool) or not isfinite(time_limit) or
+                time_limit <= 0):
+            raise RequestError("time_limit must be a positive number")
+        if not is_integer(depth) or depth < 1:
+            raise RequestError("depth must be a positive integer")
+        play = request.get('play', True)
+        if not isinstance(play, bool):
+            raise RequestError("play must be true or false")
+        time_limit = min(time_limit, self.max_time_limit)
+
+        # Apply backpressure: a full queue rejects the request instead of growing.
+        if self.pending >= self.queue_limit:
+            self.rejected += 1
+            raise RequestError("busy")
+        self.pending += 1
+        try:
+            async with game.lock:
+                position = game.get_position()
+                if not position.get_moves():
+                    raise RequestError("game is over")
+
+                # Play a book move if the position is in the opening book.
+                best_move = book.choose_move(self.opening_book, position)
+                if best_move is not None:
+                    self.book_hits += 1
+                    response = {'move': list(best_move), 'evaluation': None, 'variation': [list(best_move)],
+                                'depth': 0, 'nodes': 0, 'book': True}
+                else:
+                    # Wait for a worker. The time spent waiting counts against the time limit.
+                    async with self.slots:
+                        remaining = max(time_limit - (time() - start_time), 0)
+                        self.searches += 1
+                        result = await asyncio.get_running_loop().run_in_executor(
+                            self.pool, search_position, self.config, position.get_bitboards(), position.get_turn(),
+                            position.get_key(), position.get_score(), remaining, depth)
+                    evaluation, best_move, variation, completed_depth, nodes = result
+                    response = {'move': list(best_move), 'evaluation': json_score(evaluation),
+                                'variation': [list(move) for move in variation], 'depth': completed_depth,
+                                'nodes': nodes, 'book': False}
+
+                # Play the move.
+                if play:
+                    game.play(best_move)
+                response.update(game.describe())
+        finally:
+            self.pending -= 1
+
+        # Return the response.
+        response['time'] = time() - start_time
+        return response
+
+    # This function ends a game.
+    async def close_game(self, request):
+        game = self.find_game(request)
+        del self.games[game.get_game_id()]
+        return {'game': game.get_game_id()}
+
+    # Commands by name.
+    COMMANDS = {
+        'new-game': new_game,
+        'make-move': make_move,
+        'get-ai-move': get_ai_move,
+        'close-game': close_game,
+    }
+
+
+# This function runs the server until it is interrupted.
+async def serve(host, port, workers, queue_limit, max_time_limit):
+    server = EngineServer(workers, queue_limit, max_time_limit)
+    address = await server.start(host, port)
+    print("Serving on %s:%d with %d workers" % (address[0], address[1], server.workers))
+    try:
+        await server.serve_forever()
+    finally:
+        await server.close()
+        print(json.dumps(server.get_stats()))
+
+
+# This function parses the command line and runs the server.
+def main():
+    parser = argparse.ArgumentParser(description = "Serves many checkers games over JSON lines on a local socket.")
+    parser.add_argument('--host', default = shared_variables.SERVER_HOST)
+    parser.add_argument('--port', type = int, default = shared_variables.SERVER_PORT)
+    parser.add_argument('--workers', type = int, default = shared_variables.SERVER_WORKERS,
+                        help = "worker processes that run searches")
+    parser.add_argument('--queue-limit', type = int, default = shared_variables.SERVER_QUEUE_LIMIT,
+                        help = "searches that may wait or run before new ones are rejected")
+    parser.add_argument('--max-time-limit', type = float, default = shared_variables.SERVER_TIME_LIMIT,
+                        help = "largest time limit of a search request, in seconds")
+    arguments = parser.parse_args()
+
+    try:
+        asyncio.run(serve(arguments.host, arguments.port, arguments.workers, arguments.queue_limit,
+                          arguments.max_time_limit))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == '__main__':
+    main()
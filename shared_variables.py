@@ -1,6 +0,0 @@
-NODE_COUNTER = 0
-CUTOFF_COUNTER = 0
-CACHE = []
-TIME = 0.0
-HEURISTIC = "HISTORY"
-DEPTH = 5